@@ -1 +1,5 @@
 from .attack import *
+from .campaign import *
+from .robustness import *
+from .gym_env import *
+from .atpg import *
@@ -0,0 +1,395 @@
+import heapq
+import math
+
+import numpy as np
+
+from circuit import ALL_ONES, CompiledCircuit, LogicCircuit
+
+from .robustness import FAULT_KINDS
+
+# Logique à trois valeurs : 0, 1 et X (inconnu)
+X = 2
+
+# Valeur contrôlante des portes (une entrée à cette valeur fixe la sortie)
+_CONTROLLING = {"AND": 0, "NAND": 0, "OR": 1, "NOR": 1}
+_INVERTING = {"NAND", "NOR", "NOT", "XNOR"}
+
+
+def _eval3(gate_type: str, inputs: list[int]) -> int:
+    """Évalue une porte logique en logique à trois valeurs
+    @param gate_type: Type de la porte logique
+    @param inputs: Valeurs des entrées (0, 1 ou X)
+
+    @return: Valeur de sortie (0, 1 ou X)
+    """
+    if not inputs:
+        return 0
+    if gate_type in {"OUTPUT", "BUF"}:
+        return inputs[0]
+
+    if gate_type == "NOT":
+        value = inputs[0]
+        return X if value == X else 1 - value
+
+    if gate_type in {"AND", "NAND"}:
+        value = 0 if 0 in inputs else (X if X in inputs else 1)
+    elif gate_type in {"OR", "NOR"}:
+        value = 1 if 1 in inputs else (X if X in inputs else 0)
+    elif gate_type in {"XOR", "XNOR"}:
+        value = X if X in inputs else sum(inputs) % 2
+    else:
+        raise ValueError(f"Type de porte non supporté : {gate_type}")
+
+    if gate_type in _INVERTING and value != X:
+        value = 1 - value
+    return value
+
+
+class ATPG:
+    """Génération automatique de vecteurs de test (ATPG) par l'algorithme
+    PODEM, guidé par les mesures de contrôlabilité / observabilité SCOAP.
+    Pour une faute (stuck ou bitflip), retourne un vecteur d'entrée qui
+    active la faute et la propage jusqu'à une sortie, ou prouve que la faute
+    est indétectable (redondante)."""
+
+    def __init__(self, circuit: LogicCircuit, max_backtracks: int = 1000):
+        """Compile le circuit et calcule les mesures SCOAP
+        @param circuit: Circuit booléen analysé
+        @param max_backtracks: Nombre maximal de retours arrière par faute
+        avant d'abandonner
+        """
+        self.circuit = circuit
+        self.compiled = CompiledCircuit(circuit)
+        self.max_backtracks = max_backtracks
+        self._compute_scoap()
+
+        # Valeurs sans aucune entrée affectée, calculées une fois : chaque
+        # faute part de cet état et ne propage que depuis sa porte
+        c = self.compiled
+        self._initial = [X] * len(c.node_ids)
+        for i, gate_type in enumerate(c.types):
+            if gate_type != "INPUT":
+                self._initial[i] = _eval3(
+                    gate_type, [self._initial[p] for p in c.fanins[i]])
+        self._outputs = set(c.outputs)
+
+    def _compute_scoap(self):
+        """Calcule la contrôlabilité à 0 / 1 (CC0, CC1) et l'observabilité
+        (CO) de chaque porte"""
+        c = self.compiled
+        n = len(c.node_ids)
+        self.cc0 = [1] * n
+        self.cc1 = [1] * n
+
+        for i, gate_type in enumerate(c.types):
+            fanins = c.fanins[i]
+            if gate_type == "INPUT" or not fanins:
+                continue
+            cc0 = [self.cc0[p] for p in fanins]
+            cc1 = [self.cc1[p] for p in fanins]
+
+            if gate_type in {"OUTPUT", "BUF"}:
+                zero, one = cc0[0], cc1[0]
+            elif gate_type == "NOT":
+                zero, one = cc1[0], cc0[0]
+            elif gate_type in {"AND", "NAND"}:
+                zero, one = min(cc0), sum(cc1)
+            elif gate_type in {"OR", "NOR"}:
+                zero, one = sum(cc0), min(cc1)
+            else:
+                # XOR : combinaison des parités, entrée par entrée
+                zero, one = cc0[0], cc1[0]
+                for a0, a1 in zip(cc0[1:], cc1[1:]):
+                    zero, one = min(zero + a0, one + a1), min(zero + a1, one + a0)
+
+            if gate_type in _INVERTING and gate_type != "NOT":
+                zero, one = one, zero
+            self.cc0[i], self.cc1[i] = zero + 1, one + 1
+
+        self.co = [math.inf] * n
+        for i in c.outputs:
+            self.co[i] = 0
+        for i in reversed(range(n)):
+            if self.co[i] == math.inf:
+                continue
+            fanins = c.fanins[i]
+            gate_type = c.types[i]
+            for k, p in enumerate(fanins):
+                others = [q for j, q in enumerate(fanins) if j != k]
+                if gate_type in {"AND", "NAND"}:
+                    cost = sum(self.cc1[q] for q in others)
+                elif gate_type in {"OR", "NOR"}:
+                    cost = sum(self.cc0[q] for q in others)
+                elif gate_type in {"XOR", "XNOR"}:
+                    cost = sum(min(self.cc0[q], self.cc1[q]) for q in others)
+                else:
+                    cost = 0
+                self.co[p] = min(self.co[p], self.co[i] + cost + 1)
+
+    def generate(self, gate_id: str, fault_type: str,
+                 stuck_value: bool | None = None) -> tuple[str, dict[str, bool] | None]:
+        """Cherche un vecteur de test pour une faute
+        @param gate_id: Identifiant de la porte logique fautive
+        @param fault_type: Type de faute ("stuck" ou "bitflip")
+        @param stuck_value: Valeur de la faute stuck
+
+        @return: Tuple (statut, vecteur), le statut étant "detected" (avec le
+        vecteur d'entrée), "redundant" (faute indétectable) ou "aborted"
+        (limite de retours arrière atteinte)
+        """
+        assert fault_type in {"bitflip", "stuck"}
+        c = self.compiled
+        site = c.index[gate_id]
+
+        # Une faute sans chemin vers une sortie n'est jamais observable
+        if self.co[site] == math.inf:
+            return "redundant", None
+
+        self._site = site
+        self._fault = (fault_type, None if stuck_value is None else int(stuck_value))
+        self.good = list(self._initial)
+        self.faulty = list(self._initial)
+        self._errors = set()
+        self._imply([site])
+
+        decisions = []  # (entrée, valeur, déjà inversée)
+        backtracks = 0
+
+        while True:
+            if self._detected():
+                vector = {c.node_ids[i]: self.good[i] == 1 for i in c.inputs}
+                return "detected", vector
+
+            objective = self._objective()
+            if objective is not None:
+                pi, value = self._backtrace(*objective)
+                decisions.append((pi, value, False))
+                self._assign(pi, value)
+                continue
+
+            # Retour arrière : inversion de la dernière décision non inversée
+            while decisions and decisions[-1][2]:
+                pi, _, _ = decisions.pop()
+                self._assign(pi, X)
+            if not decisions:
+                return "redundant", None
+
+            backtracks += 1
+            if backtracks > self.max_backtracks:
+                return "aborted", None
+            pi, value, _ = decisions.pop()
+            decisions.append((pi, 1 - value, True))
+            self._assign(pi, 1 - value)
+
+    def run(self, faults: list[tuple[str, str, bool | None]] | None = None,
+            fault_dropping: bool = True) -> dict:
+        """Génère des vecteurs de test pour une liste de fautes
+        @param faults: Fautes (porte, type, valeur), par défaut toutes les
+        fautes simples de chaque porte
+        @param fault_dropping: Simule chaque nouveau vecteur sur les fautes
+        restantes pour ne pas chercher de test à celles déjà détectées
+
+        @return: Dictionnaire faute -> (statut, vecteur)
+        """
+        c = self.compiled
+        if faults is None:
+            faults = [(gate_id, *kind) for gate_id in c.node_ids
+                      for kind in FAULT_KINDS]
+
+        # Fautes sans résultat, dans l'ordre de la liste
+        pending = dict.fromkeys(faults)
+        results = {}
+        while pending:
+            fault = next(iter(pending))
+            del pending[fault]
+            status, vector = self.generate(*fault)
+            results[fault] = (status, vector)
+
+            if status == "detected" and fault_dropping:
+                for other in self._detected_by(vector, pending):
+                    results[other] = ("detected", vector)
+                    del pending[other]
+
+        return results
+
+    def _detected_by(self, vector: dict[str, bool],
+                     faults: list[tuple[str, str, bool | None]]) -> list:
+        """Simule un vecteur de test sur une liste de fautes
+        @param vector: Vecteur d'entrée
+        @param faults: Fautes (porte, type, valeur)
+
+        @return: Fautes détectées par le vecteur
+        """
+        c = self.compiled
+        input_words = {name: np.array([ALL_ONES if vector[name] else 0],
+                                      dtype=np.uint64)
+                       for name in c.input_names}
+        values = c.simulate(input_words)
+
+        detected = []
+        for gate_id, fault_type, stuck_value in faults:
+            # Faute stuck non activée par le vecteur, ou non observable
+            site = c.index[gate_id]
+            if self.co[site] == math.inf or (
+                    fault_type == "stuck"
+                    and bool(values[site][0]) == bool(stuck_value)):
+                continue
+            changed = c.simulate_fault_cone(
+                values, {c.index[gate_id]: (fault_type, stuck_value)})
+            if any(o in changed for o in c.outputs):
+                detected.append((gate_id, fault_type, stuck_value))
+        return detected
+
+    def _assign(self, pi: int, value: int):
+        """Affecte une entrée primaire et propage ses conséquences
+        @param pi: Indice de l'entrée
+        @param value: Valeur (0, 1 ou X)
+        """
+        self.good[pi] = value
+        self.faulty[pi] = self._faulty_value(pi, value, value)
+        self._mark_error(pi)
+        self._imply(self.compiled.fanouts[pi])
+
+    def _faulty_value(self, i: int, good: int, faulty: int) -> int:
+        """Valeur d'une porte dans le circuit fautif
+        @param i: Indice de la porte
+        @param good: Valeur sans faute de la porte
+        @param faulty: Valeur calculée depuis les entrées fautives
+
+        @return: Valeur fautive, modifiée si la porte est le site de la faute
+        """
+        if i != self._site:
+            return faulty
+        fault_type, stuck_value = self._fault
+        if fault_type == "stuck":
+            return stuck_value
+        return X if good == X else 1 - good
+
+    def _mark_error(self, i: int):
+        """Tient à jour les portes portant l'erreur (valeurs connues et
+        différentes dans les deux circuits)
+        @param i: Indice de la porte
+        """
+        good, faulty = self.good[i], self.faulty[i]
+        if good != X and faulty != X and good != faulty:
+            self._errors.add(i)
+        else:
+            self._errors.discard(i)
+
+    def _imply(self, start):
+        """Propage les valeurs des deux circuits (sans faute / fautif) en ne
+        recalculant que les portes dont une entrée a changé, dans l'ordre
+        topologique
+        @param start: Portes à recalculer en premier
+        """
+        types, fanins, fanouts = (self.compiled.types, self.compiled.fanins,
+                                  self.compiled.fanouts)
+        good_values, faulty_values = self.good, self.faulty
+        site = self._site
+        heap = list(start)
+        heapq.heapify(heap)
+        queued = set(heap)
+
+        while heap:
+            i = heapq.heappop(heap)
+            gate_type = types[i]
+            if gate_type == "INPUT":
+                good = good_values[i]
+                faulty = self._faulty_value(i, good, good)
+            else:
+                good_inputs = [good_values[p] for p in fanins[i]]
+                faulty_inputs = [faulty_values[p] for p in fanins[i]]
+                good = _eval3(gate_type, good_inputs)
+                # Hors du cône de la faute, les deux circuits sont identiques
+                faulty = good if faulty_inputs == good_inputs else \
+                    _eval3(gate_type, faulty_inputs)
+                if i == site:
+                    faulty = self._faulty_value(i, good, faulty)
+
+            if good == good_values[i] and faulty == faulty_values[i]:
+                continue
+            good_values[i], faulty_values[i] = good, faulty
+            self._mark_error(i)
+
+            for succ in fanouts[i]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, succ)
+
+    def _detected(self) -> bool:
+        """@return: True si une sortie diffère entre les deux circuits"""
+        return not self._errors.isdisjoint(self._outputs)
+
+    def _objective(self) -> tuple[int, int] | None:
+        """Choisit le prochain objectif (porte, valeur) : activer la faute,
+        puis propager l'erreur par la porte de la D-frontière la plus
+        observable
+
+        @return: Objectif, None si la branche courante est sans issue
+        """
+        c = self.compiled
+        site = self._site
+        fault_type, stuck_value = self._fault
+
+        # Activation : la porte fautive doit prendre la valeur opposée
+        if self.good[site] == X:
+            if fault_type == "stuck":
+                return site, 1 - stuck_value
+            value = 0 if self.cc0[site] <= self.cc1[site] else 1
+            return site, value
+        if self.good[site] == self.faulty[site]:
+            return None
+
+        # D-frontière : portes dont une entrée porte l'erreur et dont la
+        # sortie est encore inconnue
+        frontier = {i for e in self._errors for i in c.fanouts[e]
+                    if self.co[i] != math.inf
+                    and (self.good[i] == X or self.faulty[i] == X)}
+
+        if not frontier:
+            return None
+
+        # Une entrée inconnue à la valeur non contrôlante, sur la porte la
+        # plus observable
+        for i in sorted(frontier, key=lambda i: (self.co[i], i)):
+            controlling = _CONTROLLING.get(c.types[i])
+            for p in c.fanins[i]:
+                if self.good[p] == X:
+                    return p, (0 if controlling is None else 1 - controlling)
+
+        # Les inconnues ne restent que dans le circuit fautif : n'importe
+        # quelle entrée libre, pour que la recherche reste complète
+        for pi in c.inputs:
+            if self.good[pi] == X:
+                return pi, 0
+        return None
+
+    def _backtrace(self, node: int, value: int) -> tuple[int, int]:
+        """Remonte un objectif jusqu'à une entrée primaire non affectée
+        @param node: Porte de l'objectif (valeur inconnue)
+        @param value: Valeur souhaitée
+
+        @return: Tuple (entrée primaire, valeur)
+        """
+        c = self.compiled
+        while c.types[node] != "INPUT":
+            gate_type = c.types[node]
+            if gate_type in _INVERTING:
+                value = 1 - value
+
+            candidates = [p for p in c.fanins[node] if self.good[p] == X]
+            controlling = _CONTROLLING.get(gate_type)
+
+            if controlling is not None and value == controlling:
+                # Une seule entrée suffit : la plus facile à contrôler
+                cost = self.cc0 if value == 0 else self.cc1
+                node = min(candidates, key=lambda p: cost[p])
+            elif controlling is not None:
+                # Toutes les entrées sont nécessaires : la plus difficile
+                # d'abord
+                cost = self.cc0 if value == 0 else self.cc1
+                node = max(candidates, key=lambda p: cost[p])
+            else:
+                node = min(candidates,
+                           key=lambda p: min(self.cc0[p], self.cc1[p]))
+        return node, value
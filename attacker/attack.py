@@ -1,4 +1,5 @@
-import matplotlib.pyplot as plt
+import heapq
+
 import networkx as nx
 from circuit import LogicCircuit, LogicGate, bcolors
 
@@ -12,8 +13,16 @@ class FaultyCircuit(LogicCircuit):
         """Initialise le circuit booléen fautif avec un circuit booléen déjà
         construit"""
         self.graph = circuit.graph
+        self.listeners = circuit.listeners
         self.faults = {}
 
+        # État de la simulation événementielle (voir prepare)
+        self._input_values = None
+        self._order_index = None
+        self._output_ids = None
+        self._good_values = None
+        self._values = None
+
     def add_fault(self, gate_id: str, fault_type: str, stuck_value: bool = None):
         """Ajouter une faute au circuit sur la porte logique spécifié
         Il existe deux types de fautes:
@@ -32,6 +41,9 @@ class FaultyCircuit(LogicCircuit):
 
         self.faults[gate_id] = (fault_type, stuck_value)
 
+        if self._values is not None:
+            self._propagate(self._values, self.faults, [gate_id])
+
     def remove_fault(self, gate_id: str):
         """Supprime une faute du circuit sur la porte logique spécifiée
         @param gate_id: Identifiant de la porte logique où la faute doit être
@@ -43,10 +55,149 @@ class FaultyCircuit(LogicCircuit):
 
         del self.faults[gate_id]
 
+        if self._values is not None:
+            self._propagate(self._values, self.faults, [gate_id])
+
     def clear_faults(self):
         """Supprime toutes les fautes du circuit"""
         self.faults = {}
 
+        if self._good_values is not None:
+            self._values = dict(self._good_values)
+
+    def prepare(self, input_values: dict[str, bool]):
+        """Prépare la simulation événementielle pour un vecteur d'entrée fixe :
+        calcule les valeurs sans faute de chaque porte, puis celles avec les
+        fautes actuelles. Les ajouts / suppressions de fautes suivants ne
+        réévaluent que les portes en aval dont une entrée a changé.
+        À rappeler si la structure du circuit est modifiée.
+
+        @param input_values: Dictionnaire indiquant les valeurs logiques des inputs
+        """
+        order = list(nx.topological_sort(self.graph))
+        self._order_index = {gate_id: i for i, gate_id in enumerate(order)}
+        self._input_values = dict(input_values)
+        self._output_ids = [
+            gate_id for gate_id in order
+            if self.graph.nodes[gate_id]["gate"].gate_type == "OUTPUT"]
+
+        self._good_values = {}
+        for gate_id in order:
+            self._good_values[gate_id] = self._compute_gate(
+                gate_id, self._good_values, {})
+
+        self._values = dict(self._good_values)
+        self._propagate(self._values, self.faults, list(self.faults))
+
+    def evaluate_incremental(self) -> dict[str, bool]:
+        """Retourne les sorties du circuit fautif maintenues par la simulation
+        événementielle (voir prepare)
+
+        @return: Dictionnaire contenant les résultats logiques des outputs
+        """
+        if self._values is None:
+            raise ValueError(
+                f"{bcolors.WARNING}Simulation événementielle non préparée")
+
+        return self._outputs(self._values)
+
+    def try_faults(self, input_values: dict[str, bool],
+                   faults: list[tuple[str, str, bool | None]]) -> list[dict[str, bool]]:
+        """Essaie successivement chaque faute, en plus des fautes déjà
+        présentes, pour un vecteur d'entrée fixe. Les fautes essayées ne sont
+        pas conservées dans le circuit.
+
+        @param input_values: Dictionnaire indiquant les valeurs logiques des inputs
+        @param faults: Liste de tuples (porte, type de faute, valeur stuck)
+
+        @return: Liste des sorties du circuit pour chaque faute essayée
+        """
+        if self._values is None or input_values != self._input_values:
+            self.prepare(input_values)
+
+        results = []
+        for gate_id, fault_type, stuck_value in faults:
+            if not self.graph.has_node(gate_id):
+                raise ValueError(
+                    f"{bcolors.WARNING}Identifiant de la porte logique non existant")
+            assert fault_type in {"bitflip", "stuck"}
+
+            # Les valeurs modifiées sont stockées à part pour ne pas toucher à
+            # l'état courant
+            trial_faults = dict(self.faults)
+            trial_faults[gate_id] = (fault_type, stuck_value)
+            changed = _Overlay(self._values)
+            self._propagate(changed, trial_faults, [gate_id])
+            results.append(self._outputs(changed))
+
+        return results
+
+    def _compute_gate(self, gate_id: str, values, faults: dict) -> bool:
+        """Calcule la valeur d'une porte à partir des valeurs de ses
+        prédécesseurs, faute éventuelle comprise
+        @param gate_id: Identifiant de la porte logique
+        @param values: Valeurs courantes des portes
+        @param faults: Fautes à appliquer
+
+        @return: Valeur logique de la porte
+        """
+        gate: LogicGate = self.graph.nodes[gate_id]["gate"]
+        preds = list(self.graph.predecessors(gate_id))
+
+        if gate.gate_type == "INPUT":
+            if gate_id not in self._input_values:
+                raise ValueError(
+                    f"{bcolors.WARNING}Pas d'input pour la porte logique: {gate_id}")
+            value = self._input_values[gate_id]
+        elif gate.gate_type == "OUTPUT":
+            if len(preds) != 1:
+                raise ValueError(
+                    f"{bcolors.WARNING}Porte logique OUTPUT doit avoir un seul prédécesseur")
+            value = values[preds[0]]
+        else:
+            value = gate.compute([values[pred] for pred in preds])
+
+        if gate_id in faults:
+            ftype, fval = faults[gate_id]
+            if ftype == "bitflip":
+                value = not value
+            elif ftype == "stuck":
+                value = fval
+        return value
+
+    def _propagate(self, values, faults: dict, start_ids: list[str]):
+        """Réévalue les portes de départ puis, dans l'ordre topologique,
+        uniquement les successeurs des portes dont la valeur a changé
+        @param values: Valeurs des portes, mises à jour sur place
+        @param faults: Fautes à appliquer
+        @param start_ids: Portes à réévaluer en premier
+        """
+        heap = [(self._order_index[g], g) for g in set(start_ids)]
+        heapq.heapify(heap)
+        queued = set(start_ids)
+
+        while heap:
+            _, gate_id = heapq.heappop(heap)
+            queued.discard(gate_id)
+
+            value = self._compute_gate(gate_id, values, faults)
+            if value == values[gate_id]:
+                continue
+            values[gate_id] = value
+
+            for succ in self.graph.successors(gate_id):
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (self._order_index[succ], succ))
+
+    def _outputs(self, values) -> dict[str, bool]:
+        """Extrait les sorties des valeurs des portes
+        @param values: Valeurs des portes
+
+        @return: Dictionnaire contenant les résultats logiques des outputs
+        """
+        return {gate_id: values[gate_id] for gate_id in self._output_ids}
+
     def evaluate(self, input_values: dict[str, bool]) -> dict[str, bool]:
         """Calcul le résultat du circuit booléen fautif
         @param input_values: Dictionnaire indiquant les valeurs logiques des inputs
@@ -100,6 +251,7 @@ class FaultyCircuit(LogicCircuit):
 
     def visualize(self):
         """Affiche graphiquement le circuit avec les fautes en rouge"""
+        import matplotlib.pyplot as plt
 
         labels = {}
         node_colors = []
@@ -125,3 +277,17 @@ class FaultyCircuit(LogicCircuit):
         plt.title("Visualisation du circuit logique (nœuds fautifs en rouge)")
         plt.axis("off")
         plt.show()
+
+
+class _Overlay(dict):
+    """Dictionnaire de valeurs modifiées par-dessus des valeurs de base non
+    modifiées, pour essayer une faute sans recopier toutes les valeurs"""
+
+    def __init__(self, base: dict):
+        """@param base: Valeurs de base, jamais modifiées"""
+        super().__init__()
+        self.base = base
+
+    def __missing__(self, key):
+        """Valeur de base si la porte n'a pas été modifiée"""
+        return self.base[key]
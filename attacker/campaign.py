@@ -0,0 +1,392 @@
+import json
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from circuit import (CompiledCircuit, LogicCircuit, WORD_BITS,
+                     exhaustive_patterns, pattern_mask, popcount,
+                     random_patterns)
+
+# Colonnes enregistrées pour chaque job de la campagne
+CAMPAIGN_COLUMNS = {
+    "job_id": np.int64,
+    "circuit_id": np.int32,
+    "fault_set_id": np.int32,
+    "block": np.int32,
+    "patterns": np.int64,
+    "corrupted": np.int64,
+    "output_flips": np.int64,
+}
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+# Un job : (job_id, circuit_id, chemin du circuit, fault_set_id, fautes,
+# bloc de motifs, nombre de mots par bloc, graine)
+Job = tuple[int, int, str, int, list[tuple[str, str, bool | None]], int, int, int]
+
+
+def single_faults(circuit: LogicCircuit) -> Iterator[list[tuple[str, str, bool | None]]]:
+    """Énumère toutes les fautes simples (bitflip, stuck à 0, stuck à 1) de
+    chaque porte du circuit
+    @param circuit: Circuit booléen
+
+    @return: Itérateur sur des ensembles d'une seule faute
+    """
+    for gate_id in circuit.graph.nodes:
+        yield [(gate_id, "bitflip", None)]
+        yield [(gate_id, "stuck", False)]
+        yield [(gate_id, "stuck", True)]
+
+
+def make_jobs(circuit_paths: list[str],
+              fault_sets: list[list[tuple[str, str, bool | None]]] | None = None,
+              n_blocks: int = 1, n_words: int = 16, seed: int = 0) -> Iterator[Job]:
+    """Génère paresseusement les jobs d'une campagne, regroupés par circuit
+    pour que chaque worker réutilise ses circuits compilés. L'ordre est
+    déterministe, ce qui permet de reprendre une campagne interrompue.
+
+    @param circuit_paths: Chemins vers les fichiers .blif des circuits
+    @param fault_sets: Ensembles de fautes à injecter dans chaque circuit, par
+    défaut toutes les fautes simples du circuit
+    @param n_blocks: Nombre de blocs de motifs d'entrée par ensemble de fautes
+    @param n_words: Nombre de mots de 64 motifs par bloc
+    @param seed: Graine des motifs aléatoires
+
+    @return: Itérateur sur les jobs
+    """
+    job_id = 0
+    for circuit_id, path in enumerate(circuit_paths):
+        sets = fault_sets
+        if sets is None:
+            sets = single_faults(LogicCircuit.from_blif(path))
+
+        for fault_set_id, faults in enumerate(sets):
+            for block in range(n_blocks):
+                yield (job_id, circuit_id, path, fault_set_id, faults, block,
+                       n_words, seed)
+                job_id += 1
+
+
+# Cache des circuits compilés et des simulations sans faute, par worker
+_COMPILED_CACHE = {}
+_GOOD_CACHE = {}
+_CACHE_SIZE = 64
+
+
+def _compiled(path: str) -> CompiledCircuit:
+    """Retourne le circuit compilé d'un fichier, depuis le cache du worker
+    @param path: Chemin vers le fichier .blif
+
+    @return: Circuit compilé
+    """
+    if path not in _COMPILED_CACHE:
+        if len(_COMPILED_CACHE) >= _CACHE_SIZE:
+            _COMPILED_CACHE.pop(next(iter(_COMPILED_CACHE)))
+        _COMPILED_CACHE[path] = CompiledCircuit(LogicCircuit.from_blif(path))
+    return _COMPILED_CACHE[path]
+
+
+def _good_simulation(path: str, block: int, n_words: int, seed: int):
+    """Simule sans faute un bloc de motifs, depuis le cache du worker
+    @param path: Chemin vers le fichier .blif
+    @param block: Numéro du bloc de motifs
+    @param n_words: Nombre de mots par bloc
+    @param seed: Graine des motifs aléatoires
+
+    @return: Tuple (mots des entrées, sorties sans faute, masque des motifs
+    valides, nombre de motifs), None si le bloc est vide
+    """
+    key = (path, block, n_words, seed)
+    if key not in _GOOD_CACHE:
+        compiled = _compiled(path)
+        n_inputs = len(compiled.inputs)
+
+        # Petits circuits : un seul bloc avec tous les motifs possibles
+        if (1 << n_inputs) <= n_words * WORD_BITS:
+            if block > 0:
+                return None
+            patterns = exhaustive_patterns(n_inputs)
+            n_patterns = 1 << n_inputs
+        else:
+            patterns = random_patterns(n_inputs, n_words, seed + block)
+            n_patterns = n_words * WORD_BITS
+
+        input_words = {name: patterns[i]
+                       for i, name in enumerate(compiled.input_names)}
+        good = compiled.simulate(input_words)[compiled.outputs]
+        mask = pattern_mask(n_patterns, patterns.shape[1])
+
+        if len(_GOOD_CACHE) >= _CACHE_SIZE:
+            _GOOD_CACHE.pop(next(iter(_GOOD_CACHE)))
+        _GOOD_CACHE[key] = (input_words, good, mask, n_patterns)
+    return _GOOD_CACHE[key]
+
+
+def run_job(job: Job) -> tuple:
+    """Exécute un job : injecte les fautes et compare les sorties avec le
+    circuit sans faute sur un bloc de motifs
+    @param job: Job de la campagne
+
+    @return: Ligne de résultat, dans l'ordre de CAMPAIGN_COLUMNS
+    """
+    job_id, circuit_id, path, fault_set_id, faults, block, n_words, seed = job
+
+    simulation = _good_simulation(path, block, n_words, seed)
+    if simulation is None:
+        return (job_id, circuit_id, fault_set_id, block, 0, 0, 0)
+    input_words, good, mask, n_patterns = simulation
+
+    compiled = _compiled(path)
+    fault_indices = {compiled.index[gate_id]: (fault_type, stuck_value)
+                     for gate_id, fault_type, stuck_value in faults}
+    faulty = compiled.simulate(input_words, fault_indices)[compiled.outputs]
+
+    # Motifs pour lesquels au moins une sortie est corrompue
+    diff = (good ^ faulty) & mask
+    corrupted = popcount(np.bitwise_or.reduce(diff, axis=0)) if len(diff) else 0
+    output_flips = popcount(diff)
+
+    return (job_id, circuit_id, fault_set_id, block, n_patterns, corrupted,
+            output_flips)
+
+
+def _run_jobs(jobs: list[Job]) -> list[tuple]:
+    """Exécute un lot de jobs dans un worker
+    @param jobs: Lot de jobs
+
+    @return: Lignes de résultat
+    """
+    return [run_job(job) for job in jobs]
+
+
+class CampaignWriter:
+    """Écrit les résultats d'une campagne au format colonne : chaque partie
+    est un dossier contenant un fichier .npy par colonne, enregistré dans le
+    manifeste une fois complètement écrit"""
+
+    def __init__(self, output_dir: str, chunk_rows: int = 4096):
+        """Initialise l'écriture dans un dossier de campagne
+        @param output_dir: Dossier de la campagne
+        @param chunk_rows: Nombre de lignes par partie
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.chunk_rows = chunk_rows
+        self.rows = []
+
+        # Une écriture interrompue peut laisser une dernière ligne tronquée,
+        # à retirer avant d'ajouter de nouvelles lignes. Les numéros de
+        # partie suivent les dossiers présents, pour ne jamais réutiliser
+        # celui d'une partie incomplète
+        _repair_manifest(output_dir)
+        self.next_part = _next_part_number(output_dir)
+
+    def append(self, row: tuple):
+        """Ajoute une ligne de résultat, écrit une partie quand le tampon est
+        plein
+        @param row: Ligne de résultat
+        """
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Écrit les lignes en attente dans une nouvelle partie"""
+        if not self.rows:
+            return
+
+        part = f"part-{self.next_part:05d}"
+        part_dir = os.path.join(self.output_dir, part)
+        # Une partie non enregistrée dans le manifeste est incomplète
+        shutil.rmtree(part_dir, ignore_errors=True)
+        os.makedirs(part_dir)
+
+        columns = list(zip(*self.rows))
+        for (name, dtype), values in zip(CAMPAIGN_COLUMNS.items(), columns):
+            np.save(os.path.join(part_dir, f"{name}.npy"),
+                    np.asarray(values, dtype=dtype))
+
+        with open(os.path.join(self.output_dir, MANIFEST_FILENAME), "a",
+                  encoding="utf-8") as f:
+            f.write(json.dumps({"part": part, "rows": len(self.rows)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.next_part += 1
+        self.rows = []
+
+    def close(self):
+        """Écrit les dernières lignes en attente"""
+        self.flush()
+
+
+def _read_manifest(output_dir: str) -> list[dict]:
+    """Lit le manifeste des parties terminées d'une campagne
+    @param output_dir: Dossier de la campagne
+
+    @return: Liste des parties enregistrées
+    """
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return []
+
+    parts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            # Une ligne tronquée correspond à une partie incomplète
+            try:
+                parts.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return parts
+
+
+def _repair_manifest(output_dir: str):
+    """Réécrit le manifeste avec ses seules lignes complètes, si une écriture
+    interrompue en a laissé une tronquée
+    @param output_dir: Dossier de la campagne
+    """
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    parts = _read_manifest(output_dir)
+    lines = "".join(json.dumps(part) + "\n" for part in parts)
+    if lines == text:
+        return
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _next_part_number(output_dir: str) -> int:
+    """Numéro de la prochaine partie : après toutes les parties du dossier,
+    enregistrées dans le manifeste ou non
+    @param output_dir: Dossier de la campagne
+
+    @return: Numéro de partie
+    """
+    numbers = [int(name[len("part-"):]) for name in os.listdir(output_dir)
+               if name.startswith("part-") and name[len("part-"):].isdigit()]
+    return max(numbers, default=-1) + 1
+
+
+def iter_campaign(output_dir: str) -> Iterator[dict[str, np.ndarray]]:
+    """Parcourt les résultats d'une campagne partie par partie, les colonnes
+    étant projetées en mémoire (mmap) pour ne pas tout charger
+    @param output_dir: Dossier de la campagne
+
+    @return: Itérateur sur des dictionnaires colonne -> tableau
+    """
+    for part in _read_manifest(output_dir):
+        part_dir = os.path.join(output_dir, part["part"])
+        yield {name: np.load(os.path.join(part_dir, f"{name}.npy"),
+                             mmap_mode="r")
+               for name in CAMPAIGN_COLUMNS}
+
+
+class CompletedJobs:
+    """Ensemble des jobs terminés d'une campagne, gardé sous forme de bitmap
+    (un bit par identifiant de job) pour que la reprise d'une très grande
+    campagne ne charge pas tous les identifiants en mémoire"""
+
+    def __init__(self):
+        """Initialise un ensemble vide"""
+        self.bitmap = np.zeros(0, dtype=np.uint8)
+
+    def add(self, job_ids: np.ndarray):
+        """Ajoute des jobs terminés
+        @param job_ids: Identifiants des jobs
+        """
+        if not len(job_ids):
+            return
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        size = int(job_ids.max()) // 8 + 1
+        if size > len(self.bitmap):
+            # Agrandissement géométrique
+            size = max(size, 2 * len(self.bitmap))
+            self.bitmap = np.concatenate(
+                [self.bitmap, np.zeros(size - len(self.bitmap), dtype=np.uint8)])
+        np.bitwise_or.at(self.bitmap, job_ids >> 3,
+                         np.left_shift(1, job_ids & 7).astype(np.uint8))
+
+    def __contains__(self, job_id: int) -> bool:
+        """@return: True si le job est terminé"""
+        byte = job_id >> 3
+        return byte < len(self.bitmap) and \
+            bool(self.bitmap[byte] >> (job_id & 7) & 1)
+
+    def __len__(self) -> int:
+        """@return: Nombre de jobs terminés"""
+        return popcount(self.bitmap)
+
+
+def completed_jobs(output_dir: str) -> CompletedJobs:
+    """Liste les jobs déjà terminés d'une campagne, partie par partie
+    @param output_dir: Dossier de la campagne
+
+    @return: Ensemble des jobs terminés
+    """
+    done = CompletedJobs()
+    for part in iter_campaign(output_dir):
+        done.add(part["job_id"])
+    return done
+
+
+def run_campaign(jobs: Iterable[Job], output_dir: str,
+                 n_workers: int | None = None, batch_size: int = 64,
+                 chunk_rows: int = 4096, resume: bool = True):
+    """Lance une campagne d'injection de fautes sur un pool de processus, les
+    résultats étant écrits au fil de l'eau. Le nombre de lots en cours est
+    borné, les jobs peuvent donc être plus nombreux que la mémoire.
+
+    @param jobs: Itérateur sur les jobs (voir make_jobs)
+    @param output_dir: Dossier de la campagne
+    @param n_workers: Nombre de processus, par défaut le nombre de CPU
+    @param batch_size: Nombre de jobs envoyés à la fois à un worker
+    @param chunk_rows: Nombre de lignes par partie écrite
+    @param resume: Reprend une campagne existante en sautant les jobs déjà
+    terminés, sinon le dossier est vidé
+    """
+    if not resume:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    done = completed_jobs(output_dir)
+    pending = (job for job in jobs if job[0] not in done)
+    writer = CampaignWriter(output_dir, chunk_rows)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    # Les lignes déjà reçues sont écrites même si la campagne est
+    # interrompue (erreur d'un worker, Ctrl-C) : elles ne seront pas
+    # recalculées à la reprise
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            in_flight = set()
+            while True:
+                # Garde au plus deux lots par worker en attente
+                while len(in_flight) < 2 * n_workers:
+                    batch = list(islice(pending, batch_size))
+                    if not batch:
+                        break
+                    in_flight.add(pool.submit(_run_jobs, batch))
+
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight,
+                                           return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for row in future.result():
+                        writer.append(row)
+    finally:
+        writer.close()
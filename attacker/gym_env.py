@@ -0,0 +1,188 @@
+import gymnasium as gym
+import numpy as np
+
+from circuit import (CompiledCircuit, LogicCircuit, WORD_BITS,
+                     exhaustive_patterns, pattern_mask, random_patterns)
+
+from .attack import FaultyCircuit
+from .robustness import FAULT_KINDS
+
+
+class FaultAttackEnv(gym.Env):
+    """Environnement Gym pour l'attaquant : à chaque étape, l'agent place une
+    faute (bitflip, stuck à 0 ou stuck à 1) sur une porte du circuit et il est
+    récompensé par l'augmentation de la corruption des sorties, mesurée sur un
+    lot de motifs d'entrée simulés en bit-parallèle.
+    Le circuit est compilé et simulé sans faute une seule fois, chaque faute
+    n'est ensuite propagée que dans son cône de sortie.
+    """
+
+    def __init__(self, circuit: LogicCircuit, max_faults: int = 4,
+                 n_words: int = 16, fault_cost: float = 0.01, seed: int = 0):
+        """
+        Initialise l'environnement d'attaque
+
+        @param circuit: Circuit booléen attaqué
+        @param max_faults: Nombre de fautes avant la fin de l'épisode
+        @param n_words: Nombre de mots de 64 motifs d'entrée aléatoires (les
+        petits circuits sont simulés sur tous les motifs possibles)
+        @param fault_cost: Coût de chaque faute placée
+        @param seed: Graine des motifs d'entrée
+        """
+        super().__init__()
+        self.circuit = circuit
+        self.max_faults = max_faults
+        self.fault_cost = fault_cost
+
+        # Compilation et simulation sans faute une fois pour toutes
+        self.compiled = CompiledCircuit(circuit)
+        self.n_gates = len(self.compiled.node_ids)
+        n_inputs = len(self.compiled.inputs)
+
+        if (1 << n_inputs) <= n_words * WORD_BITS:
+            patterns = exhaustive_patterns(n_inputs)
+            self.n_patterns = 1 << n_inputs
+        else:
+            patterns = random_patterns(n_inputs, n_words, seed)
+            self.n_patterns = n_words * WORD_BITS
+        self.mask = pattern_mask(self.n_patterns, patterns.shape[1])
+
+        input_words = {name: patterns[i]
+                       for i, name in enumerate(self.compiled.input_names)}
+        self.good_values = self.compiled.simulate(input_words)
+        self.good_values.setflags(write=False)
+        self.output_indices = np.array(self.compiled.outputs, dtype=np.int64)
+
+        # Action : indice de porte * nombre de types de fautes + type de faute
+        self.n_kinds = len(FAULT_KINDS)
+        self.action_space = gym.spaces.Discrete(self.n_gates * self.n_kinds)
+
+        # Observation : fautes placées (one-hot par porte), part des motifs
+        # où chaque porte diffère du circuit sans faute, corruption des sorties
+        self.observation_space = gym.spaces.Box(
+            low=0, high=1,
+            shape=(self.n_gates * (self.n_kinds + 1) + 1,),
+            dtype=np.float32)
+
+        self.values = None
+        self.faults = {}
+        self.fault_state = np.zeros((self.n_gates, self.n_kinds),
+                                    dtype=np.float32)
+        self.deviation = np.zeros(self.n_gates, dtype=np.float32)
+        self.action_mask = np.ones(self.action_space.n, dtype=bool)
+        self.corruption = 0.0
+
+    def reset(self, seed: int | None = None, options: None = None):
+        """
+        Réinitialise l'environnement : circuit sans faute
+
+        @return: Observation initiale, informations supplémentaires
+        """
+        super().reset(seed=seed)
+        self.values = self.good_values.copy()
+        self.faults = {}
+        self.fault_state[:] = 0
+        self.deviation[:] = 0
+        self.action_mask[:] = True
+        self.corruption = 0.0
+
+        return self._get_obs(), self._get_info()
+
+    def step(self, action):
+        """
+        Place une faute sur une porte du circuit
+
+        @param action: Indice de porte * nombre de types de fautes + type
+        @return: Observation, récompense, bool de fin d'épisode, bool de troncature, infos
+        """
+        action = int(action)
+        gate, kind = divmod(action, self.n_kinds)
+
+        if not self.action_mask[action]:
+            # Porte déjà fautive
+            reward = -1.0
+        else:
+            self.faults[gate] = FAULT_KINDS[kind]
+            self.fault_state[gate, kind] = 1
+            self.action_mask[gate * self.n_kinds:(gate + 1) * self.n_kinds] = False
+
+            # Propagation de la nouvelle faute depuis les valeurs déjà fautives
+            changed = self.compiled.simulate_fault_cone(
+                self.values, self.faults, start=[gate])
+            if changed:
+                indices = np.fromiter(changed, dtype=np.int64,
+                                      count=len(changed))
+                self.values[indices] = np.stack(list(changed.values()))
+                diff = (self.values[indices] ^ self.good_values[indices]) \
+                    & self.mask
+                self.deviation[indices] = _popcount_rows(diff) / self.n_patterns
+
+            previous = self.corruption
+            self.corruption = self._output_corruption()
+            reward = self.corruption - previous - self.fault_cost
+
+        done = len(self.faults) >= self.max_faults or self.corruption >= 1.0 \
+            or not self.action_mask.any()
+
+        return self._get_obs(), reward, done, False, self._get_info()
+
+    def get_action_mask(self) -> np.ndarray:
+        """
+        Masque des actions valides : une seule faute par porte
+        """
+        return self.action_mask.copy()
+
+    def faulty_circuit(self) -> FaultyCircuit:
+        """
+        Retourne le circuit avec les fautes placées pendant l'épisode
+
+        @return: Circuit fautif
+        """
+        faulty = FaultyCircuit(self.circuit)
+        for gate, (fault_type, stuck_value) in self.faults.items():
+            faulty.add_fault(self.compiled.node_ids[gate], fault_type,
+                             stuck_value)
+        return faulty
+
+    def _output_corruption(self) -> float:
+        """
+        Part des motifs d'entrée pour lesquels au moins une sortie est
+        corrompue
+
+        @return: Corruption entre 0 et 1
+        """
+        if not len(self.output_indices):
+            return 0.0
+        diff = self.values[self.output_indices] ^ \
+            self.good_values[self.output_indices]
+        corrupted = np.bitwise_or.reduce(diff, axis=0) & self.mask
+        return float(_popcount_rows(corrupted[None, :])[0]) / self.n_patterns
+
+    def _get_obs(self) -> np.ndarray:
+        """
+        Retourne l'observation applatie
+
+        @return: numpy array représentant l'état
+        """
+        return np.concatenate([self.fault_state.ravel(), self.deviation,
+                               [self.corruption]]).astype(np.float32)
+
+    def _get_info(self) -> dict:
+        """
+        Informations supplémentaires : masque d'actions et corruption
+
+        @return: Dictionnaire d'informations
+        """
+        return {"action_mask": self.get_action_mask(),
+                "corruption": self.corruption,
+                "n_faults": len(self.faults)}
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Compte les bits à 1 de chaque ligne d'un tableau de mots
+    @param words: Tableau (n_lignes, n_words) de mots uint64
+
+    @return: Tableau (n_lignes,) du nombre de bits à 1
+    """
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=1)
+    return bits.sum(axis=1)
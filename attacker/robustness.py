@@ -0,0 +1,333 @@
+import hashlib
+import time
+import zlib
+
+import networkx as nx
+import numpy as np
+
+from circuit import (IncrementalSimulator, LogicCircuit, WORD_BITS,
+                     apply_fault_words, bcolors, compute_words, popcount,
+                     random_patterns)
+
+# Fautes simples considérées sur chaque porte
+FAULT_KINDS = [("bitflip", None), ("stuck", False), ("stuck", True)]
+
+
+def _cone_order(graph: nx.DiGraph, gate_id: str) -> list[str]:
+    """Portes du cône de sortie d'une porte (comprise), dans un ordre
+    topologique
+    @param graph: Graphe acyclique du circuit
+    @param gate_id: Identifiant de la porte
+
+    @return: Portes du cône, chaque porte après ses prédécesseurs du cône
+    """
+    cone = _reachable(graph.successors, {gate_id})
+    pending = {n: sum(1 for p in graph.predecessors(n) if p in cone)
+               for n in cone}
+    order = [gate_id]
+    for n in order:
+        for succ in graph.successors(n):
+            pending[succ] -= 1
+            if pending[succ] == 0:
+                order.append(succ)
+    return order
+
+
+def _reachable(neighbors, sources: set[str]) -> set[str]:
+    """Ensemble des portes atteignables depuis plusieurs portes de départ
+    (comprises), en un seul parcours
+    @param neighbors: Fonction donnant les voisins d'une porte
+    @param sources: Portes de départ
+
+    @return: Portes atteignables
+    """
+    seen = set(sources)
+    stack = list(sources)
+    while stack:
+        for n in neighbors(stack.pop()):
+            if n not in seen:
+                seen.add(n)
+                stack.append(n)
+    return seen
+
+
+def _gate_hash(text: str) -> int:
+    """Hash 64 bits d'un élément de la structure d'un circuit
+    @param text: Description de la porte ou de la connexion
+
+    @return: Hash entier
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(),
+                          "little")
+
+
+class RobustnessEvaluator:
+    """Estimation de la robustesse d'un circuit aux fautes simples : part des
+    couples (faute, motif d'entrée) dont l'effet est masqué sur les sorties,
+    sur un échantillon de fautes et de motifs. Les résultats sont gardés par
+    faute et seules les fautes dont le cône peut avoir changé sont réévaluées
+    après une modification du circuit."""
+
+    def __init__(self, circuit: LogicCircuit, n_faults: int = 64,
+                 n_words: int = 4, time_budget: float | None = None,
+                 seed: int = 0, cache_size: int = 256,
+                 cache: dict | None = None):
+        """Initialise l'évaluateur et s'abonne aux modifications du circuit
+        @param circuit: Circuit booléen évalué
+        @param n_faults: Nombre de fautes échantillonnées
+        @param n_words: Nombre de mots de 64 motifs d'entrée aléatoires
+        @param time_budget: Temps maximal (secondes) par appel à score, les
+        fautes restantes sont évaluées aux appels suivants
+        @param seed: Graine de l'échantillonnage
+        @param cache_size: Nombre de scores gardés par structure de circuit,
+        0 pour désactiver le cache
+        @param cache: Cache des scores par structure à réutiliser (partagé
+        entre les évaluateurs de plusieurs épisodes), nouveau si None
+        """
+        if cache_size < 0:
+            raise ValueError(
+                f"{bcolors.WARNING}La taille du cache doit être positive ou nulle")
+
+        self.circuit = circuit
+        self.n_faults = n_faults
+        self.n_words = n_words
+        self.time_budget = time_budget
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.cache_size = cache_size
+        self.cache = {} if cache is None else cache
+
+        # Fautes échantillonnées (porte, type, valeur) -> part masquée
+        self.faults = []
+        self.results = {}
+
+        # Valeurs sans faute tenues à jour sur le cône des modifications
+        self.simulator = IncrementalSimulator(circuit, self._input_words,
+                                              n_words)
+
+        # Hash de la structure : somme (xor) des hash des portes et des
+        # connexions, mise à jour à chaque modification
+        graph = circuit.graph
+        self.gate_hashes = {n: _gate_hash(f"{n}:{graph.nodes[n]['gate'].gate_type}")
+                            for n in graph.nodes}
+        self._hash = 0
+        for h in self.gate_hashes.values():
+            self._hash ^= h
+        for a, b in graph.edges:
+            self._hash ^= _gate_hash(f"{a}>{b}")
+
+        circuit.add_listener(self.on_event)
+
+    def close(self):
+        """Se désabonne des modifications du circuit"""
+        self.circuit.remove_listener(self.on_event)
+        self.simulator.close()
+
+    def on_event(self, event: str, *args):
+        """Note les portes modifiées (voir LogicCircuit.add_listener)
+        @param event: Nom de l'évènement
+        @param args: Arguments de l'évènement
+        """
+        if event == "add_gate":
+            gate_id = args[0]
+            gate_type = self.circuit.graph.nodes[gate_id]["gate"].gate_type
+            self.gate_hashes[gate_id] = _gate_hash(f"{gate_id}:{gate_type}")
+            self._hash ^= self.gate_hashes[gate_id]
+        elif event == "remove_gate":
+            gate_id, preds, succs = args
+            self._hash ^= self.gate_hashes.pop(gate_id)
+            for p in preds:
+                self._hash ^= _gate_hash(f"{p}>{gate_id}")
+            for s in succs:
+                self._hash ^= _gate_hash(f"{gate_id}>{s}")
+
+            # La porte supprimée pouvait atteindre une sortie : les fautes en
+            # amont changent de cône
+            self._drop_upstream(preds)
+            self.faults = [f for f in self.faults if f[0] != gate_id]
+            for kind in FAULT_KINDS:
+                self.results.pop((gate_id, *kind), None)
+        elif event in {"connect", "disconnect"}:
+            from_id, to_id = args
+            self._hash ^= _gate_hash(f"{from_id}>{to_id}")
+
+            # La fonction de to_id change pour les fautes en amont (dont
+            # from_id, qui n'est plus en amont après une déconnexion), ce qui
+            # ne compte que si to_id atteint une sortie
+            if self.results and self._reaches_output(to_id):
+                self._drop_upstream([from_id, to_id])
+
+    def structural_hash(self) -> str:
+        """Hash de la structure du circuit (types des portes et connexions),
+        indépendant de l'ordre des portes et tenu à jour à chaque modification
+
+        @return: Hash hexadécimal
+        """
+        return f"{self._hash:016x}"
+
+    def score(self) -> float | None:
+        """Estime la robustesse du circuit aux fautes simples
+
+        @return: Part des couples (faute, motif) masqués (entre 0 et 1), None
+        si le circuit contient une boucle ou aucune faute n'a été évaluée
+        """
+        # Toute boucle passe par une porte modifiée depuis le dernier appel
+        if not self.simulator.update():
+            return None
+
+        key = self.structural_hash()
+        if key in self.cache:
+            return self.cache[key]
+
+        self._invalidate()
+        self._sample_faults()
+
+        # Évaluation des fautes sans résultat, dans la limite du budget
+        start = time.perf_counter()
+        for fault in self.faults:
+            if fault in self.results:
+                continue
+            if self.time_budget is not None and \
+                    time.perf_counter() - start > self.time_budget:
+                break
+            self.results[fault] = self._masked_fraction(fault)
+
+        evaluated = [self.results[f] for f in self.faults if f in self.results]
+        if not evaluated:
+            return None
+        score = float(np.mean(evaluated))
+
+        # Score mis en cache seulement s'il porte sur tout l'échantillon
+        if self.cache_size and len(evaluated) == len(self.faults):
+            while len(self.cache) >= self.cache_size:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[key] = score
+        return score
+
+    def _drop_upstream(self, gates: list[str]):
+        """Supprime les résultats des fautes situées sur ou en amont de
+        portes, dont le cône de sortie vient de changer de structure
+        @param gates: Portes dont le cône de sortie a changé
+        """
+        if not self.results:
+            return
+        graph = self.circuit.graph
+        stale = _reachable(graph.predecessors,
+                           {n for n in gates if graph.has_node(n)})
+        self.results = {f: r for f, r in self.results.items()
+                        if f[0] not in stale}
+
+    def _reaches_output(self, gate_id: str) -> bool:
+        """Indique si une sortie est atteignable depuis une porte
+        @param gate_id: Identifiant de la porte
+
+        @return: True si la porte est une sortie ou en amont d'une sortie
+        """
+        graph = self.circuit.graph
+        seen = {gate_id}
+        stack = [gate_id]
+        while stack:
+            n = stack.pop()
+            if graph.nodes[n]["gate"].gate_type == "OUTPUT":
+                return True
+            for succ in graph.successors(n):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return False
+
+    def _invalidate(self):
+        """Supprime les résultats des fautes dont le cône contient une valeur
+        sans faute modifiée (les changements de structure sont traités à
+        chaque évènement) : une porte dont la valeur ou la valeur d'une entrée
+        a changé, si elle atteint une sortie, change le résultat des fautes
+        situées sur elle ou en amont."""
+        graph = self.circuit.graph
+        changed = self.simulator.changed
+        self.simulator.changed = set()
+        if not changed or not self.results:
+            return
+
+        roots = set(changed)
+        for n in changed:
+            roots.update(graph.successors(n))
+        self._drop_upstream(list(self._reaching_outputs(roots)))
+
+    def _reaching_outputs(self, gates: set[str]) -> set[str]:
+        """Portes parmi gates dont une sortie est atteignable, en ne parcourant
+        que leur cône de sortie
+        @param gates: Portes testées
+
+        @return: Portes atteignant une sortie
+        """
+        graph = self.circuit.graph
+        cone = _reachable(graph.successors, gates)
+        outputs = {n for n in cone
+                   if graph.nodes[n]["gate"].gate_type == "OUTPUT"}
+
+        # Remontée depuis les sorties du cône, sans en sortir
+        seen = set(outputs)
+        stack = list(outputs)
+        while stack:
+            for pred in graph.predecessors(stack.pop()):
+                if pred in cone and pred not in seen:
+                    seen.add(pred)
+                    stack.append(pred)
+        return gates & seen
+
+    def _input_words(self, name: str) -> np.ndarray:
+        """Motifs aléatoires d'une entrée, fixes pour un nom d'entrée donné
+        @param name: Nom de l'entrée
+
+        @return: Mots des motifs de l'entrée
+        """
+        seed = (self.seed << 32) | zlib.crc32(name.encode())
+        return random_patterns(1, self.n_words, seed)[0]
+
+    def _sample_faults(self):
+        """Complète l'échantillon de fautes avec des fautes tirées au hasard
+        parmi les portes actuelles"""
+        gates = list(self.circuit.graph.nodes)
+        universe = len(gates) * len(FAULT_KINDS)
+        target = min(self.n_faults, universe)
+        sampled = set(self.faults)
+
+        while len(self.faults) < target:
+            gate_id = gates[self.rng.integers(len(gates))]
+            kind = FAULT_KINDS[self.rng.integers(len(FAULT_KINDS))]
+            fault = (gate_id, *kind)
+            if fault not in sampled:
+                sampled.add(fault)
+                self.faults.append(fault)
+
+    def _masked_fraction(self, fault: tuple[str, str, bool | None]) -> float:
+        """Simule une faute sur son cône de sortie, à partir des valeurs sans
+        faute tenues à jour
+        @param fault: Faute (porte, type, valeur)
+
+        @return: Part des motifs pour lesquels aucune sortie n'est corrompue
+        """
+        gate_id, fault_type, stuck_value = fault
+        graph = self.circuit.graph
+        values = self.simulator.values
+
+        changed = {}
+        for n in _cone_order(graph, gate_id):
+            if n == gate_id:
+                words = apply_fault_words(values[n], (fault_type, stuck_value))
+            elif any(p in changed for p in graph.predecessors(n)):
+                words = compute_words(
+                    graph.nodes[n]["gate"].gate_type,
+                    [changed.get(p, values[p]) for p in graph.predecessors(n)])
+            else:
+                continue
+            if not np.array_equal(words, values[n]):
+                changed[n] = words
+
+        corrupted = np.zeros(self.n_words, dtype=np.uint64)
+        for n, words in changed.items():
+            if graph.nodes[n]["gate"].gate_type == "OUTPUT":
+                corrupted |= words ^ values[n]
+
+        return 1 - popcount(corrupted) / (self.n_words * WORD_BITS)
@@ -0,0 +1,63 @@
+import argparse
+import subprocess
+import sys
+
+# Mesure du temps d'import des modules du projet dans un processus neuf, pour
+# détecter une régression (dépendance lourde importée trop tôt)
+
+MODULES = ["circuit", "attacker", "construct_agent"]
+
+# Dépendances de visualisation qui ne doivent être chargées qu'au rendu
+LAZY_MODULES = ["matplotlib", "matplotlib.pyplot"]
+
+
+def import_time(module: str) -> float:
+    """Mesure le temps d'import cumulé d'un module avec python -X importtime
+    @param module: Nom du module à importer
+
+    @return: Temps d'import en millisecondes
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                              f"import {module}"],
+                             capture_output=True, text=True, check=True)
+
+    # Format : "import time: self [us] | cumulative | imported package"
+    for line in process.stderr.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"Temps d'import introuvable pour {module}")
+
+
+def loaded_lazy_modules(module: str) -> list[str]:
+    """Liste les dépendances de visualisation chargées par l'import d'un module
+    @param module: Nom du module à importer
+
+    @return: Modules de visualisation chargés
+    """
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    process = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True, text=True, check=True)
+    return process.stdout.split()
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark du temps d'import des modules du projet")
+parser.add_argument("--repeat", type=int, default=5,
+                    help="Nombre de mesures par module (le minimum est gardé)")
+parser.add_argument("--max-ms", type=float, default=None,
+                    help="Temps d'import maximal autorisé par module")
+args = parser.parse_args()
+
+failed = False
+for module in MODULES:
+    best = min(import_time(module) for _ in range(args.repeat))
+    lazy = loaded_lazy_modules(module)
+    print(f"{module:<16} {best:8.1f} ms  visualisation chargée: "
+          f"{', '.join(lazy) or 'non'}")
+
+    if lazy or (args.max_ms is not None and best > args.max_ms):
+        failed = True
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,87 @@
+import argparse
+import sys
+import time
+
+from circuit import LogicGate
+from construct_agent import LogicCircuitEnv
+
+# Mesure du coût d'une étape de l'environnement constructeur selon la taille
+# du circuit, pour vérifier qu'il croît linéairement (action factorisée et
+# observation en graphe) jusqu'à quelques centaines de portes
+
+SIZES = [50, 100, 200, 400]
+
+
+def build_env(target_filepath: str, abc_path: str, n_gates: int) -> LogicCircuitEnv:
+    """Crée un environnement dont le circuit valide compte n_gates portes :
+    une chaîne de portes AND reliées à chaque entrée de la cible
+    @param target_filepath: Chemin vers le fichier .blif du circuit cible
+    @param abc_path: Chemin vers l'exécutable ABC
+    @param n_gates: Nombre de portes du circuit
+
+    @return: Environnement réinitialisé
+    """
+    env = LogicCircuitEnv(target_filepath, abc_path, max_gates=n_gates + 1,
+                          action_mode="factored", observation_mode="graph",
+                          verbose=False)
+    env.reset(seed=0)
+    circuit = env.circuit
+    inputs = list(env.target.inputs)
+    output = env.target.outputs[0]
+
+    # Insertion de la chaîne entre la première porte et la première sortie
+    previous = next(circuit.graph.predecessors(output))
+    circuit.disconnect(previous, output)
+    while len(circuit.graph.nodes) < n_gates:
+        gate = LogicGate("AND")
+        circuit.add_gate(gate)
+        circuit.connect(previous, gate.gate_id)
+        circuit.connect(inputs[len(circuit.graph.nodes) % len(inputs)],
+                        gate.gate_id)
+        previous = gate.gate_id
+    circuit.connect(previous, output)
+    assert circuit.is_valid()
+    return env
+
+
+def step_time(env: LogicCircuitEnv, repeat: int) -> float:
+    """Mesure une étape d'ajout puis une étape de suppression de porte (le
+    circuit redevient valide et est comparé à la cible)
+    @param env: Environnement
+    @param repeat: Nombre de couples d'étapes mesurés
+
+    @return: Temps moyen d'une étape en millisecondes
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        env.step((0, 0, 0, 0))
+        last = len(env.circuit.graph.nodes) - 1
+        new_gate = list(env.circuit.graph.nodes)[last]
+        index = sorted(env.circuit.graph.nodes).index(new_gate)
+        env.step((1, 0, index, 0))
+    return (time.perf_counter() - start) / (2 * repeat) * 1000
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark du coût d'une étape selon la taille du circuit")
+parser.add_argument("target_blif", help="Circuit cible (.blif)")
+parser.add_argument("--abc-path", default="/usr/bin/abc",
+                    help="Chemin vers l'exécutable ABC")
+parser.add_argument("--repeat", type=int, default=20,
+                    help="Nombre de couples d'étapes mesurés par taille")
+parser.add_argument("--max-ratio", type=float, default=None,
+                    help="Rapport maximal autorisé entre le coût par porte "
+                         "de la plus grande et de la plus petite taille")
+args = parser.parse_args()
+
+per_gate = []
+for n_gates in SIZES:
+    env = build_env(args.target_blif, args.abc_path, n_gates)
+    ms = step_time(env, args.repeat)
+    per_gate.append(ms / n_gates)
+    print(f"{n_gates:>5} portes {ms:8.2f} ms/étape "
+          f"{1000 * ms / n_gates:8.2f} µs/porte")
+
+ratio = per_gate[-1] / per_gate[0]
+print(f"rapport coût par porte {SIZES[-1]}/{SIZES[0]}: {ratio:.2f}")
+sys.exit(1 if args.max_ratio is not None and ratio > args.max_ratio else 0)
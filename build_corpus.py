@@ -0,0 +1,29 @@
+import argparse
+import glob
+
+from circuit import CircuitCorpus, write_corpus
+
+# Regroupe des circuits BLIF dans un corpus indexé, utilisable par
+# l'environnement constructeur via la clé "corpus" de config.json
+
+parser = argparse.ArgumentParser(
+    description="Création d'un corpus de circuits cibles")
+parser.add_argument("output", help="Chemin du fichier du corpus")
+parser.add_argument("blif", nargs="+",
+                    help="Fichiers .blif ou motifs glob (ex: 'circuits/*.blif')")
+parser.add_argument("--random-words", type=int, default=64,
+                    help="Mots de motifs aléatoires des circuits à plus de "
+                         "16 entrées")
+parser.add_argument("--seed", type=int, default=0,
+                    help="Graine des motifs aléatoires")
+args = parser.parse_args()
+
+paths = sorted({path for pattern in args.blif
+                for path in (glob.glob(pattern) or [pattern])})
+n_circuits = write_corpus(paths, args.output,
+                          n_random_words=args.random_words, seed=args.seed)
+
+corpus = CircuitCorpus(args.output)
+print(f"{n_circuits} circuits écrits dans {args.output} "
+      f"({len(corpus.select(exhaustive=True))} avec table de vérité complète)")
+corpus.close()
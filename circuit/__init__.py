@@ -1,4 +1,11 @@
+from .analysis import *
+from .bdd import *
+from .blif import *
 from .checker import *
 from .colors import *
+from .corpus import *
 from .logic_circuit import *
 from .logic_gate import *
+from .signatures import *
+from .simulation import *
+from .target import *
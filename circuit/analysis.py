@@ -0,0 +1,222 @@
+import heapq
+from collections import Counter
+
+import networkx as nx
+
+
+class CircuitAnalysis:
+    """Analyse structurelle d'un circuit maintenue de manière incrémentale :
+    niveau logique de chaque porte (plus long chemin depuis une entrée),
+    profondeur jusqu'à une sortie (-1 si aucune sortie n'est atteignable),
+    chemin critique (niveau maximal des sorties) et surface (nombre de
+    portes par type). Seules les portes dont le niveau ou la profondeur
+    change sont recalculées après une modification."""
+
+    def __init__(self, circuit):
+        """Calcule l'analyse initiale et s'abonne aux modifications du circuit
+        @param circuit: Circuit booléen (LogicCircuit) analysé
+        """
+        self.circuit = circuit
+        circuit.add_listener(self.on_event)
+        self.recompute()
+
+    def close(self):
+        """Se désabonne des modifications du circuit"""
+        self.circuit.remove_listener(self.on_event)
+
+    def recompute(self):
+        """Recalcule entièrement l'analyse (tri topologique)"""
+        graph = self.circuit.graph
+        self.level = {}
+        self.depth = {}
+        # Nombre de sorties par niveau, pour le chemin critique
+        self.output_level_count = Counter()
+        self.types = {n: graph.nodes[n]["gate"].gate_type for n in graph.nodes}
+        self.area = Counter(self.types.values())
+        self._max_level = 0
+
+        self.cyclic = not nx.is_directed_acyclic_graph(graph)
+        if self.cyclic:
+            return
+
+        order = list(nx.topological_sort(graph))
+        for node in order:
+            self.level[node] = max((self.level[p] + 1
+                                    for p in graph.predecessors(node)),
+                                   default=0)
+            if self.types[node] == "OUTPUT":
+                self.output_level_count[self.level[node]] += 1
+        for node in reversed(order):
+            self.depth[node] = self._output_depth(node)
+        self._max_level = max(self.output_level_count, default=0)
+
+    @property
+    def critical_path(self) -> int | None:
+        """Longueur du chemin critique (plus long chemin entrée -> sortie, en
+        nombre de connexions) : niveau maximal des portes OUTPUT, les chaînes
+        qui n'atteignent aucune sortie ne comptent pas. None si le circuit
+        contient une boucle"""
+        if self.cyclic:
+            return None
+
+        # Le niveau maximal n'est corrigé qu'à la lecture
+        while self._max_level > 0 and \
+                self.output_level_count[self._max_level] == 0:
+            self._max_level -= 1
+        return self._max_level
+
+    @property
+    def gate_count(self) -> int:
+        """Nombre de portes logiques, hors entrées et sorties"""
+        return sum(count for gate_type, count in self.area.items()
+                   if gate_type not in {"INPUT", "OUTPUT"})
+
+    def slack(self, gate_id: str) -> int | None:
+        """Marge d'une porte par rapport au chemin critique (0 si la porte est
+        sur le chemin critique)
+        @param gate_id: Identifiant de la porte logique
+
+        @return: Marge de la porte, None si le circuit contient une boucle ou
+        si la porte n'atteint aucune sortie
+        """
+        if self.cyclic or self.depth[gate_id] < 0:
+            return None
+        return self.critical_path - self.level[gate_id] - self.depth[gate_id]
+
+    def metrics(self) -> dict:
+        """Résumé des métriques d'efficacité du circuit
+
+        @return: Dictionnaire (chemin critique, nombre de portes, surface)
+        """
+        return {
+            "critical_path": self.critical_path,
+            "gate_count": self.gate_count,
+            "area": {t: c for t, c in self.area.items() if c > 0},
+        }
+
+    def on_event(self, event: str, *args):
+        """Met à jour l'analyse après une modification du circuit
+        @param event: Nom de l'évènement (voir LogicCircuit.add_listener)
+        @param args: Arguments de l'évènement
+        """
+        graph = self.circuit.graph
+
+        # La surface reste à jour même en présence d'une boucle
+        removed_type = None
+        if event == "add_gate":
+            gate_type = graph.nodes[args[0]]["gate"].gate_type
+            self.types[args[0]] = gate_type
+            self.area[gate_type] += 1
+        elif event == "remove_gate":
+            removed_type = self.types.pop(args[0])
+            self.area[removed_type] -= 1
+
+        if self.cyclic:
+            # Tant qu'il reste une boucle, les niveaux ne sont pas définis
+            if nx.is_directed_acyclic_graph(graph):
+                self.recompute()
+            return
+
+        if event == "add_gate":
+            gate_id = args[0]
+            self._set_level(gate_id, 0)
+            self.depth[gate_id] = self._output_depth(gate_id)
+
+        elif event == "remove_gate":
+            gate_id, preds, succs = args
+            level = self.level.pop(gate_id)
+            if removed_type == "OUTPUT":
+                self.output_level_count[level] -= 1
+            del self.depth[gate_id]
+            self._update(succs, forward=True)
+            self._update(preds, forward=False)
+
+        elif event == "connect":
+            from_id, to_id = args
+            if not self._update([to_id], forward=True, source=from_id):
+                # La connexion a créé une boucle, les niveaux ne sont plus
+                # définis jusqu'à sa suppression
+                self.cyclic = True
+                self.level = {}
+                self.depth = {}
+                self.output_level_count = Counter()
+                return
+            self._update([from_id], forward=False)
+
+        elif event == "disconnect":
+            from_id, to_id = args
+            self._update([to_id], forward=True)
+            self._update([from_id], forward=False)
+
+    def _set_level(self, gate_id: str, level: int):
+        """Change le niveau d'une porte en tenant à jour le décompte des
+        niveaux des sorties
+        @param gate_id: Identifiant de la porte logique
+        @param level: Nouveau niveau
+        """
+        old = self.level.get(gate_id)
+        self.level[gate_id] = level
+        if self.types[gate_id] != "OUTPUT":
+            return
+        if old is not None:
+            self.output_level_count[old] -= 1
+        self.output_level_count[level] += 1
+        self._max_level = max(self._max_level, level)
+
+    def _output_depth(self, gate_id: str) -> int:
+        """Calcule la profondeur d'une porte depuis celles de ses successeurs
+        @param gate_id: Identifiant de la porte logique
+
+        @return: Plus long chemin jusqu'à une sortie, -1 si aucune sortie
+        n'est atteignable
+        """
+        if self.types[gate_id] == "OUTPUT":
+            return 0
+        return max((self.depth[s] + 1
+                    for s in self.circuit.graph.successors(gate_id)
+                    if self.depth[s] >= 0), default=-1)
+
+    def _update(self, start_ids: list[str], forward: bool,
+                source: str | None = None) -> bool:
+        """Propage un changement de niveau (forward) ou de profondeur
+        (backward) en ne recalculant que les portes dont une valeur voisine a
+        changé, par ordre croissant de valeur
+        @param start_ids: Portes à recalculer en premier
+        @param forward: True pour les niveaux, False pour les profondeurs
+        @param source: Porte dont la modification révèle une boucle
+
+        @return: False si une boucle a été détectée
+        """
+        graph = self.circuit.graph
+        values = self.level if forward else self.depth
+        inputs = graph.predecessors if forward else graph.successors
+        outputs = graph.successors if forward else graph.predecessors
+
+        heap = [(values[n], n) for n in set(start_ids) if n in values]
+        heapq.heapify(heap)
+        queued = {n for _, n in heap}
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            queued.discard(node)
+
+            if forward:
+                value = max((values[n] + 1 for n in inputs(node)), default=0)
+            else:
+                value = self._output_depth(node)
+            if value == values[node]:
+                continue
+            if node == source:
+                return False
+
+            if forward:
+                self._set_level(node, value)
+            else:
+                values[node] = value
+
+            for n in outputs(node):
+                if n not in queued:
+                    queued.add(n)
+                    heapq.heappush(heap, (values[n], n))
+
+        return True
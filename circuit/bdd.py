@@ -0,0 +1,319 @@
+import networkx as nx
+
+from .blif import BlifModel
+
+
+class BDDNodeLimitExceeded(Exception):
+    """Levée quand le nombre de noeuds du BDD dépasse la limite fixée"""
+
+
+class BDD:
+    """Gestionnaire de diagrammes de décision binaires réduits et ordonnés
+    (ROBDD). Chaque noeud est un entier : 0 et 1 sont les terminaux, les
+    autres noeuds sont uniques grâce à la table d'unicité, deux fonctions
+    sont donc égales si et seulement si leurs racines sont égales."""
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, variables: list[str], max_nodes: int = 200_000,
+                 cache_size: int = 1 << 16):
+        """Initialise le gestionnaire
+        @param variables: Noms des variables, dans l'ordre du BDD (la
+        première est à la racine)
+        @param max_nodes: Nombre maximal de noeuds avant BDDNodeLimitExceeded
+        @param cache_size: Nombre maximal d'entrées du cache des calculs
+        """
+        self.variables = list(variables)
+        self.level = {name: i for i, name in enumerate(self.variables)}
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+
+        # Les terminaux ont un niveau après toutes les variables
+        n_vars = len(self.variables)
+        self.var = [n_vars, n_vars]
+        self.low = [0, 1]
+        self.high = [0, 1]
+
+        self.unique = {}
+        self.cache = {}
+
+    @property
+    def node_count(self) -> int:
+        """Nombre de noeuds du gestionnaire, terminaux compris"""
+        return len(self.var)
+
+    def variable(self, name: str) -> int:
+        """Retourne le BDD d'une variable
+        @param name: Nom de la variable
+
+        @return: Noeud du BDD
+        """
+        return self._make(self.level[name], self.FALSE, self.TRUE)
+
+    def _make(self, level: int, low: int, high: int) -> int:
+        """Crée (ou retrouve) un noeud en respectant les règles de réduction
+        @param level: Niveau de la variable du noeud
+        @param low: Noeud si la variable vaut 0
+        @param high: Noeud si la variable vaut 1
+
+        @return: Noeud du BDD
+        """
+        if low == high:
+            return low
+
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            if len(self.var) >= self.max_nodes:
+                raise BDDNodeLimitExceeded(
+                    f"Limite de {self.max_nodes} noeuds BDD atteinte")
+            node = len(self.var)
+            self.var.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """Calcule if-then-else(f, g, h) = (f et g) ou (non f et h)
+        @param f: Condition
+        @param g: Noeud si f est vraie
+        @param h: Noeud si f est fausse
+
+        @return: Noeud du BDD
+        """
+        # Cas terminaux
+        if f == self.TRUE:
+            return g
+        if f == self.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == self.TRUE and h == self.FALSE:
+            return f
+
+        key = (f, g, h)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        level = min(self.var[f], self.var[g], self.var[h])
+        f0, f1 = self._cofactors(f, level)
+        g0, g1 = self._cofactors(g, level)
+        h0, h1 = self._cofactors(h, level)
+        result = self._make(level, self.ite(f0, g0, h0),
+                            self.ite(f1, g1, h1))
+
+        # Cache à perte : vidé entièrement quand il est plein
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = result
+        return result
+
+    def _cofactors(self, node: int, level: int) -> tuple[int, int]:
+        """Cofacteurs d'un noeud par rapport à la variable d'un niveau
+        @param node: Noeud du BDD
+        @param level: Niveau de la variable
+
+        @return: Tuple (cofacteur à 0, cofacteur à 1)
+        """
+        if self.var[node] != level:
+            return node, node
+        return self.low[node], self.high[node]
+
+    def not_(self, f: int) -> int:
+        """@return: Négation de f"""
+        return self.ite(f, self.FALSE, self.TRUE)
+
+    def and_(self, f: int, g: int) -> int:
+        """@return: f et g"""
+        return self.ite(f, g, self.FALSE)
+
+    def or_(self, f: int, g: int) -> int:
+        """@return: f ou g"""
+        return self.ite(f, self.TRUE, g)
+
+    def xor(self, f: int, g: int) -> int:
+        """@return: f ou exclusif g"""
+        return self.ite(f, self.not_(g), g)
+
+    def gate(self, gate_type: str, inputs: list[int]) -> int:
+        """Calcule le BDD d'une porte logique sur toutes ses entrées, comme
+        dans l'export BLIF
+        @param gate_type: Type de la porte logique
+        @param inputs: BDD des entrées de la porte
+
+        @return: Noeud du BDD
+        """
+        if gate_type in {"OUTPUT", "BUF"}:
+            return inputs[0]
+        if gate_type == "NOT":
+            return self.not_(inputs[0])
+
+        if gate_type in {"AND", "NAND"}:
+            op, result = self.and_, self.TRUE
+        elif gate_type in {"OR", "NOR"}:
+            op, result = self.or_, self.FALSE
+        elif gate_type in {"XOR", "XNOR"}:
+            op, result = self.xor, self.FALSE
+        else:
+            raise ValueError(f"Type de porte non supporté : {gate_type}")
+
+        for node in inputs:
+            result = op(result, node)
+
+        if gate_type in {"NAND", "NOR", "XNOR"}:
+            result = self.not_(result)
+        return result
+
+    def cover(self, inputs: list[int], cover: list[tuple[str, str]]) -> int:
+        """Calcule le BDD d'une couverture BLIF (somme de produits)
+        @param inputs: BDD des entrées du noeud
+        @param cover: Couverture du noeud, liste de (motif, valeur de sortie)
+
+        @return: Noeud du BDD
+        """
+        result = self.FALSE
+        for pattern, _ in cover:
+            term = self.TRUE
+            for literal, node in zip(pattern, inputs):
+                if literal == "1":
+                    term = self.and_(term, node)
+                elif literal == "0":
+                    term = self.and_(term, self.not_(node))
+            result = self.or_(result, term)
+
+        if cover and cover[0][1] == "0":
+            result = self.not_(result)
+        return result
+
+    def checkpoint(self) -> int:
+        """Marque l'état actuel du gestionnaire
+
+        @return: Marque à passer à rollback
+        """
+        return len(self.var)
+
+    def rollback(self, mark: int):
+        """Supprime tous les noeuds créés depuis une marque, pour libérer les
+        BDD temporaires sans toucher aux précédents
+        @param mark: Marque retournée par checkpoint
+        """
+        for node in range(mark, len(self.var)):
+            del self.unique[(self.var[node], self.low[node], self.high[node])]
+        del self.var[mark:]
+        del self.low[mark:]
+        del self.high[mark:]
+        self.cache.clear()
+
+
+def dfs_variable_order(model: BlifModel) -> list[str]:
+    """Ordre des variables par parcours en profondeur depuis les sorties :
+    les entrées utilisées ensemble restent proches, ce qui limite en général
+    la taille des BDD
+    @param model: Modèle BLIF du circuit
+
+    @return: Noms des entrées dans l'ordre du BDD
+    """
+    fanins = {node: node_fanins for node_fanins, node, _ in model.nodes}
+    inputs = set(model.inputs)
+    order = []
+    seen = set()
+
+    for output in model.outputs:
+        stack = [output]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            if node in inputs:
+                order.append(node)
+            stack.extend(reversed(fanins.get(node, ())))
+
+    # Entrées inutilisées à la fin
+    order.extend(name for name in model.inputs if name not in seen)
+    return order
+
+
+class BDDEquivalenceChecker:
+    """Vérification d'équivalence par BDD : le BDD du circuit cible est
+    construit une seule fois, chaque circuit candidat est construit dans le
+    même gestionnaire et comparé par égalité des racines"""
+
+    def __init__(self, target, max_nodes: int = 200_000,
+                 cache_size: int = 1 << 16, order: str | list[str] = "dfs"):
+        """Construit le BDD du circuit cible
+        @param target: Circuit cible (TargetCircuit)
+        @param max_nodes: Nombre maximal de noeuds BDD, au delà la
+        vérification abandonne (il faut alors passer par ABC)
+        @param cache_size: Nombre maximal d'entrées du cache des calculs
+        @param order: Ordre des variables : "dfs" (parcours depuis les
+        sorties), "input" (ordre des entrées du BLIF) ou liste de noms
+        """
+        self.target = target
+        if order == "dfs":
+            variables = dfs_variable_order(target.model)
+        elif order == "input":
+            variables = list(target.inputs)
+        else:
+            variables = list(order)
+
+        self.bdd = BDD(variables, max_nodes, cache_size)
+
+        # Si le BDD cible explose, toutes les vérifications passent par ABC
+        try:
+            self.target_roots = self._build_target()
+        except BDDNodeLimitExceeded:
+            self.target_roots = None
+            self.bdd.rollback(2)
+        self.mark = self.bdd.checkpoint()
+
+    def _build_target(self) -> dict[str, int]:
+        """Construit le BDD de chaque sortie du circuit cible
+
+        @return: Dictionnaire sortie -> racine du BDD
+        """
+        nodes = {name: self.bdd.variable(name) for name in self.target.inputs}
+        for fanins, node, cover in self.target.model.nodes:
+            nodes[node] = self.bdd.cover([nodes[f] for f in fanins], cover)
+        return {output: nodes[output] for output in self.target.outputs}
+
+    def check(self, circuit) -> bool | None:
+        """Vérifie l'équivalence d'un circuit candidat avec le circuit cible
+        @param circuit: Circuit booléen (LogicCircuit) candidat
+
+        @return: Booléen d'équivalence, None si la limite de noeuds est
+        atteinte
+        """
+        if self.target_roots is None:
+            return None
+
+        graph = circuit.graph
+        blif_inputs = {n for n in graph.nodes if graph.in_degree(n) == 0}
+        blif_outputs = {n for n in graph.nodes if graph.out_degree(n) == 0}
+        if blif_inputs != set(self.target.inputs) or \
+                blif_outputs != set(self.target.outputs):
+            return False
+
+        try:
+            nodes = {}
+            for gate_id in nx.topological_sort(graph):
+                gate = graph.nodes[gate_id]["gate"]
+                if gate.gate_type == "INPUT":
+                    if gate_id not in self.bdd.level:
+                        return False
+                    nodes[gate_id] = self.bdd.variable(gate_id)
+                else:
+                    nodes[gate_id] = self.bdd.gate(
+                        gate.gate_type,
+                        [nodes[p] for p in graph.predecessors(gate_id)])
+
+            return all(nodes[output] == root
+                       for output, root in self.target_roots.items())
+        except BDDNodeLimitExceeded:
+            return None
+        finally:
+            # Les noeuds du candidat sont libérés, seul le cible est gardé
+            self.bdd.rollback(self.mark)
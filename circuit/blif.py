@@ -0,0 +1,125 @@
+class BlifModel:
+    """Représentation mémoire d'un modèle BLIF combinatoire : listes des
+    entrées / sorties et des noeuds `.names` (couverture en somme de
+    produits), triés dans l'ordre topologique"""
+
+    def __init__(self, name: str, inputs: list[str], outputs: list[str],
+                 nodes: list[tuple[tuple[str, ...], str, list[tuple[str, str]]]]):
+        """Initialisation du modèle
+        @param name: Nom du modèle (.model)
+        @param inputs: Noms des entrées (.inputs)
+        @param outputs: Noms des sorties (.outputs)
+        @param nodes: Liste de (entrées du noeud, nom du noeud, couverture),
+        la couverture étant une liste de (motif d'entrées, valeur de sortie)
+        """
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.nodes = nodes
+
+    def to_text(self) -> str:
+        """Sérialise le modèle sous forme BLIF normalisée (un noeud par bloc,
+        dans l'ordre topologique)
+
+        @return: Texte BLIF
+        """
+        lines = [f".model {self.name}",
+                 ".inputs " + " ".join(self.inputs),
+                 ".outputs " + " ".join(self.outputs)]
+        for fanins, node, cover in self.nodes:
+            lines.append(f".names {' '.join(fanins + (node,))}")
+            for pattern, value in cover:
+                lines.append(f"{pattern} {value}" if pattern else value)
+        lines.append(".end")
+        return "\n".join(lines) + "\n"
+
+
+def parse_blif(text: str) -> BlifModel:
+    """Analyse un texte BLIF combinatoire (un seul modèle, uniquement des
+    `.names`)
+    @param text: Contenu du fichier BLIF
+
+    @return: Modèle BLIF avec les noeuds triés topologiquement
+    """
+
+    # Suppression des commentaires et fusion des lignes coupées par '\'
+    lines = []
+    pending = ""
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].rstrip()
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        line = (pending + line).strip()
+        pending = ""
+        if line:
+            lines.append(line)
+
+    name = "circuit"
+    inputs = []
+    outputs = []
+    nodes = {}
+    current = None
+
+    for line in lines:
+        tokens = line.split()
+        keyword = tokens[0]
+
+        if keyword == ".model":
+            name = tokens[1] if len(tokens) > 1 else name
+        elif keyword == ".inputs":
+            inputs.extend(tokens[1:])
+        elif keyword == ".outputs":
+            outputs.extend(tokens[1:])
+        elif keyword == ".names":
+            if len(tokens) < 2:
+                raise ValueError("Directive .names sans signal de sortie")
+            current = (tuple(tokens[1:-1]), tokens[-1], [])
+            if current[1] in nodes:
+                raise ValueError(f"Signal défini plusieurs fois : {current[1]}")
+            nodes[current[1]] = current
+        elif keyword == ".end":
+            break
+        elif keyword.startswith("."):
+            raise ValueError(f"Directive BLIF non supportée : {keyword}")
+        else:
+            # Ligne de couverture du dernier .names
+            if current is None:
+                raise ValueError(f"Ligne de couverture hors d'un .names : {line}")
+            if current[0]:
+                if len(tokens) != 2 or len(tokens[0]) != len(current[0]):
+                    raise ValueError(f"Ligne de couverture invalide : {line}")
+                current[2].append((tokens[0], tokens[1]))
+            else:
+                current[2].append(("", tokens[0]))
+
+    # Tri topologique des noeuds (les .names ne sont pas forcément ordonnés)
+    defined = set(inputs)
+    ordered = []
+    remaining = list(nodes.values())
+    while remaining:
+        ready = [n for n in remaining if all(f in defined for f in n[0])]
+        if not ready:
+            missing = {f for n in remaining for f in n[0] if f not in defined}
+            raise ValueError(
+                f"Signaux non définis ou boucle combinatoire : {sorted(missing)}")
+        for node in ready:
+            defined.add(node[1])
+            ordered.append(node)
+        remaining = [n for n in remaining if n[1] not in defined]
+
+    for output in outputs:
+        if output not in defined:
+            raise ValueError(f"Sortie non définie : {output}")
+
+    return BlifModel(name, inputs, outputs, ordered)
+
+
+def read_blif(filepath: str) -> BlifModel:
+    """Lit et analyse un fichier BLIF
+    @param filepath: Chemin vers le fichier .blif
+
+    @return: Modèle BLIF
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        return parse_blif(f.read())
@@ -0,0 +1,239 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .blif import BlifModel, parse_blif, read_blif
+from .colors import bcolors
+from .target import TargetCircuit
+
+# En-tête du fichier : signature, version, nombre d'entrées, position de
+# l'index, nombre de mots des motifs aléatoires et graine
+CORPUS_MAGIC = b"CIRCCORP"
+CORPUS_VERSION = 1
+_HEADER = struct.Struct("<8sIQQIQ")
+_HEADER_SIZE = 64
+
+# Index : une ligne de taille fixe par circuit, lue directement depuis le
+# fichier pour un accès et un filtrage en O(1)
+CORPUS_INDEX_DTYPE = np.dtype([
+    ("text_offset", "<u8"),
+    ("text_length", "<u4"),
+    ("signature_offset", "<u8"),
+    ("n_words", "<u4"),
+    ("n_inputs", "<u2"),
+    ("n_outputs", "<u2"),
+    ("n_nodes", "<u4"),
+    ("exhaustive", "?"),
+    ("structural_hash", "S16"),
+])
+
+
+def _padding(size: int) -> bytes:
+    """@return: Octets nuls pour aligner une taille sur 8 octets"""
+    return b"\0" * (-size % 8)
+
+
+class CorpusWriter:
+    """Écrit un corpus de circuits cibles dans un seul fichier : pour chaque
+    circuit, le BLIF normalisé et les signatures de ses sorties (table de
+    vérité complète ou motifs aléatoires), puis un index de taille fixe. Le
+    fichier n'est visible sous son nom qu'une fois complètement écrit"""
+
+    def __init__(self, filepath: str, n_random_words: int = 64,
+                 seed: int = 0):
+        """Initialise l'écriture du corpus
+        @param filepath: Chemin du fichier du corpus
+        @param n_random_words: Nombre de mots de motifs aléatoires des
+        circuits dont la table de vérité est trop grande
+        @param seed: Graine des motifs aléatoires
+        """
+        self.filepath = filepath
+        self.n_random_words = n_random_words
+        self.seed = seed
+        self.rows = []
+
+        self._tmp_path = f"{filepath}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * _HEADER_SIZE)
+        self._offset = _HEADER_SIZE
+
+    def add(self, model: BlifModel) -> int:
+        """Ajoute un circuit au corpus
+        @param model: Modèle BLIF du circuit
+
+        @return: Identifiant du circuit dans le corpus
+        """
+        target = TargetCircuit(model, self.n_random_words, self.seed)
+        text = target.blif_text.encode()
+        signatures = np.ascontiguousarray(target.signatures, dtype="<u8")
+
+        text_offset = self._write(text)
+        signature_offset = self._write(signatures.tobytes())
+
+        self.rows.append((text_offset, len(text), signature_offset,
+                          signatures.shape[1], len(target.inputs),
+                          len(target.outputs), len(model.nodes),
+                          target.exhaustive, target.structural_hash.encode()))
+        return len(self.rows) - 1
+
+    def add_blif(self, filepath: str) -> int:
+        """Ajoute un circuit au corpus depuis un fichier BLIF
+        @param filepath: Chemin vers le fichier .blif
+
+        @return: Identifiant du circuit dans le corpus
+        """
+        return self.add(read_blif(filepath))
+
+    def _write(self, data: bytes) -> int:
+        """Écrit des données alignées sur 8 octets
+        @param data: Données à écrire
+
+        @return: Position des données dans le fichier
+        """
+        offset = self._offset
+        self._file.write(data)
+        self._file.write(_padding(len(data)))
+        self._offset += len(data) + len(_padding(len(data)))
+        return offset
+
+    def close(self):
+        """Écrit l'index et l'en-tête, puis publie le fichier"""
+        if self._file is None:
+            return
+        index = np.array(self.rows, dtype=CORPUS_INDEX_DTYPE)
+        index_offset = self._write(index.tobytes())
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION,
+                                      len(self.rows), index_offset,
+                                      self.n_random_words, self.seed))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.filepath)
+
+
+def write_corpus(blif_paths: list[str], filepath: str, **kwargs) -> int:
+    """Crée un corpus à partir de fichiers BLIF
+    @param blif_paths: Chemins vers les fichiers .blif
+    @param filepath: Chemin du fichier du corpus
+    @param kwargs: Paramètres du CorpusWriter
+
+    @return: Nombre de circuits du corpus
+    """
+    writer = CorpusWriter(filepath, **kwargs)
+    for path in blif_paths:
+        writer.add_blif(path)
+    writer.close()
+    return len(writer.rows)
+
+
+class CircuitCorpus:
+    """Lecture d'un corpus de circuits cibles projeté en mémoire (mmap) :
+    l'index et les signatures ne sont pas copiés, et les workers qui ouvrent
+    le même fichier partagent les mêmes pages"""
+
+    def __init__(self, filepath: str):
+        """Ouvre un corpus
+        @param filepath: Chemin du fichier du corpus
+        """
+        self.filepath = filepath
+        self._open()
+
+    def _open(self):
+        """Projette le fichier en mémoire et lit l'en-tête et l'index"""
+        with open(self.filepath, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_entries, index_offset, n_random_words, seed = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(
+                f"{bcolors.WARNING}Fichier de corpus invalide: {self.filepath}")
+
+        self.n_random_words = n_random_words
+        self.seed = seed
+        self.index = np.frombuffer(self._mmap, dtype=CORPUS_INDEX_DTYPE,
+                                   count=n_entries, offset=index_offset)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def text(self, circuit_id: int) -> str:
+        """@return: BLIF normalisé d'un circuit du corpus"""
+        row = self.index[circuit_id]
+        start = int(row["text_offset"])
+        return self._mmap[start:start + int(row["text_length"])].decode()
+
+    def signatures(self, circuit_id: int) -> np.ndarray:
+        """@return: Signatures des sorties d'un circuit (n_outputs, n_words),
+        en lecture seule et sans copie"""
+        row = self.index[circuit_id]
+        n_outputs, n_words = int(row["n_outputs"]), int(row["n_words"])
+        return np.frombuffer(self._mmap, dtype="<u8",
+                             count=n_outputs * n_words,
+                             offset=int(row["signature_offset"])
+                             ).reshape(n_outputs, n_words)
+
+    def target(self, circuit_id: int) -> TargetCircuit:
+        """Construit le circuit cible d'une entrée, sans le simuler
+        @param circuit_id: Identifiant du circuit dans le corpus
+
+        @return: Circuit cible précalculé
+        """
+        return TargetCircuit(parse_blif(self.text(circuit_id)),
+                             n_random_words=self.n_random_words,
+                             seed=self.seed,
+                             signatures=self.signatures(circuit_id))
+
+    def metadata(self, circuit_id: int) -> dict:
+        """@return: Métadonnées d'un circuit (entrées, sorties, noeuds...)"""
+        row = self.index[circuit_id]
+        return {"n_inputs": int(row["n_inputs"]),
+                "n_outputs": int(row["n_outputs"]),
+                "n_nodes": int(row["n_nodes"]),
+                "exhaustive": bool(row["exhaustive"]),
+                "structural_hash": row["structural_hash"].decode()}
+
+    def select(self, min_inputs: int = 0, max_inputs: int | None = None,
+               max_outputs: int | None = None, max_nodes: int | None = None,
+               exhaustive: bool | None = None) -> np.ndarray:
+        """Filtre les circuits du corpus sur leurs métadonnées
+        @param min_inputs: Nombre minimal d'entrées
+        @param max_inputs: Nombre maximal d'entrées
+        @param max_outputs: Nombre maximal de sorties
+        @param max_nodes: Nombre maximal de noeuds BLIF
+        @param exhaustive: Filtre sur la table de vérité complète
+
+        @return: Identifiants des circuits retenus
+        """
+        index = self.index
+        keep = index["n_inputs"] >= min_inputs
+        if max_inputs is not None:
+            keep &= index["n_inputs"] <= max_inputs
+        if max_outputs is not None:
+            keep &= index["n_outputs"] <= max_outputs
+        if max_nodes is not None:
+            keep &= index["n_nodes"] <= max_nodes
+        if exhaustive is not None:
+            keep &= index["exhaustive"] == exhaustive
+        return np.flatnonzero(keep)
+
+    def close(self):
+        """Ferme le corpus (la projection est libérée une fois les derniers
+        tableaux qui en dépendent supprimés)"""
+        self.index = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __getstate__(self) -> dict:
+        """Seul le chemin est transmis aux workers, qui rouvrent le fichier"""
+        return {"filepath": self.filepath}
+
+    def __setstate__(self, state: dict):
+        """Rouvre le corpus dans le worker"""
+        self.filepath = state["filepath"]
+        self._open()
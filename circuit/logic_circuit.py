@@ -1,6 +1,8 @@
-import matplotlib.pyplot as plt
+import itertools
+
 import networkx as nx
 
+from .blif import read_blif
 from .colors import bcolors
 from .logic_gate import LogicGate
 
@@ -16,12 +18,46 @@ class LogicCircuit:
         acyclique"""
         self.graph = nx.DiGraph()
 
+        # Fonctions appelées après chaque modification du circuit, pour les
+        # structures maintenues de manière incrémentale
+        self.listeners = []
+
+    def add_listener(self, listener):
+        """Enregistre une fonction appelée après chaque modification du
+        circuit, avec le nom de l'évènement et ses arguments :
+        - ("add_gate", gate_id)
+        - ("remove_gate", gate_id, prédécesseurs, successeurs)
+        - ("connect", from_id, to_id)
+        - ("disconnect", from_id, to_id)
+
+        @param listener: Fonction à appeler
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Retire une fonction enregistrée avec add_listener
+        @param listener: Fonction à retirer
+        """
+        self.listeners.remove(listener)
+
+    def _notify(self, event: str, *args):
+        """Prévient les listeners d'une modification du circuit
+        @param event: Nom de l'évènement
+        @param args: Arguments de l'évènement
+        """
+        for listener in self.listeners:
+            listener(event, *args)
+
     def add_gate(self, gate: LogicGate):
         """Ajoute une porte logique au circuit
         @param gate: Porte logique à ajouté au circuit
         """
+        is_new = not self.graph.has_node(gate.gate_id)
         self.graph.add_node(gate.gate_id, gate=gate, label=gate.gate_id)
 
+        if is_new:
+            self._notify("add_gate", gate.gate_id)
+
     def connect(self, from_id: str, to_id: str):
         """Connecte deux noeuds / portes logiques, ex: C a pour entrée A et B
         @param from_id: Identifiant de la porte d'origine, ex: A -> C, B->C,
@@ -34,8 +70,12 @@ class LogicCircuit:
             raise ValueError(
                 f"{bcolors.WARNING}Identifiant de la porte logique non existant")
 
+        is_new = not self.graph.has_edge(from_id, to_id)
         self.graph.add_edge(from_id, to_id)
 
+        if is_new:
+            self._notify("connect", from_id, to_id)
+
     def remove_gate(self, gate_id: str) -> bool:
         """Supprimer une porte logique du graphe
         @param gate_id: Identifiant de la porte à supprimé
@@ -51,12 +91,15 @@ class LogicCircuit:
         # Sauvegarde du graphe avant la suppression pour pouvoir backup
         # si la suppression n'est pas validable
         bk = self.graph.copy()
+        preds = list(self.graph.predecessors(gate_id))
+        succs = list(self.graph.successors(gate_id))
         self.graph.remove_node(gate_id)
 
         if not self.is_valid():
             self.graph = bk
             return False
 
+        self._notify("remove_gate", gate_id, preds, succs)
         return True
 
     def disconnect(self, from_id: str, to_id: str):
@@ -71,36 +114,42 @@ class LogicCircuit:
                 f"{bcolors.WARNING}Identifiant de la porte logique non existant")
 
         self.graph.remove_edge(from_id, to_id)
+        self._notify("disconnect", from_id, to_id)
 
     def is_valid(self) -> bool:
         """Vérification que le circuit est correct
         Input et output bien liées, chaque porte à assez d'entrées
+        Coût linéaire en la taille du circuit : un seul parcours depuis
+        toutes les entrées
 
         @return: Booléen de la validité du graphe
         """
-
+        inputs = []
+        outputs = []
         for node in self.graph.nodes:
-            gate = self.graph.nodes[node]["gate"]
-            preds = list(self.graph.predecessors(node))
+            gate_type = self.graph.nodes[node]["gate"].gate_type
+            n_preds = self.graph.in_degree(node)
 
             # Vérification que les noeuds ont bien assez d'entrées
-            if gate.gate_type in {"NOT", "OUTPUT"} and len(preds) != 1:
+            if gate_type in {"NOT", "BUF", "OUTPUT"} and n_preds != 1:
                 return False
-            if gate.gate_type in {"AND", "OR", "XOR", "NAND", "NOR", "XNOR"} and len(preds) < 2:
+            if gate_type in {"AND", "OR", "XOR", "NAND", "NOR", "XNOR"} and n_preds < 2:
                 return False
 
-            # Vérifie que chaque OUTPUT est atteignable depuis au moins un INPUT
-            inputs = [n for n in self.graph.nodes if self.graph.nodes[n]
-                      ["gate"].gate_type == "INPUT"]
-            outputs = [n for n in self.graph.nodes if self.graph.nodes[n]
-                       ["gate"].gate_type == "OUTPUT"]
-
-            for output in outputs:
-                reachable = any(nx.has_path(self.graph, src, output)
-                                for src in inputs)
-                if not reachable:
-                    return False
-        return True
+            if gate_type == "INPUT":
+                inputs.append(node)
+            elif gate_type == "OUTPUT":
+                outputs.append(node)
+
+        # Vérifie que chaque OUTPUT est atteignable depuis au moins un INPUT
+        reachable = set(inputs)
+        stack = list(inputs)
+        while stack:
+            for succ in self.graph.successors(stack.pop()):
+                if succ not in reachable:
+                    reachable.add(succ)
+                    stack.append(succ)
+        return all(output in reachable for output in outputs)
 
     def evaluate(self, input_values: dict[str, bool]) -> dict[str, bool]:
         """Calcul le résultat du circuit booléen
@@ -148,6 +197,9 @@ class LogicCircuit:
 
     def visualize(self):
         """Affiche graphiquement le circuit"""
+        # Import à la demande : le coeur du circuit reste utilisable (et
+        # rapide à importer) sans matplotlib
+        import matplotlib.pyplot as plt
 
         labels = {}
         node_colors = []
@@ -261,3 +313,84 @@ class LogicCircuit:
                         f"Type de porte non reconnu : {gate_type}")
 
             f.write(".end\n")
+
+    @classmethod
+    def from_blif(cls, filename: str) -> "LogicCircuit":
+        """
+        Importe un circuit logique depuis un fichier BLIF, chaque noeud
+        `.names` devant correspondre à une porte logique connue (comme ceux
+        générés par export_to_blif).
+
+        @param filename: Nom du fichier BLIF à importer
+
+        @return: Circuit logique
+        """
+        model = read_blif(filename)
+        circuit = cls()
+
+        # Porte logique qui porte chaque signal BLIF
+        signals = {}
+        for name in model.inputs:
+            circuit.add_gate(LogicGate("INPUT", name))
+            signals[name] = name
+
+        for fanins, node, cover in model.nodes:
+            gate_type = _cover_gate_type(len(fanins), cover)
+            if gate_type is None:
+                raise ValueError(
+                    f"Le noeud {node} ne correspond à aucune porte logique connue")
+
+            if gate_type == "BUF":
+                # Un buffer est transparent, il reprend la porte de son entrée
+                signals[node] = signals[fanins[0]]
+            else:
+                # Une sortie calculée directement passe par une porte interne
+                gate_id = f"{node}_gate" if node in model.outputs else node
+                circuit.add_gate(LogicGate(gate_type, gate_id))
+                for fanin in fanins:
+                    circuit.connect(signals[fanin], gate_id)
+                signals[node] = gate_id
+
+            if node in model.outputs:
+                circuit.add_gate(LogicGate("OUTPUT", node))
+                circuit.connect(signals[node], node)
+
+        return circuit
+
+
+def _cover_gate_type(n_inputs: int, cover: list[tuple[str, str]]) -> str | None:
+    """Reconnaît le type de porte logique d'une couverture BLIF à partir de sa
+    table de vérité
+    @param n_inputs: Nombre d'entrées du noeud
+    @param cover: Couverture du noeud, liste de (motif, valeur de sortie)
+
+    @return: Type de la porte logique ("BUF" pour un buffer), None si inconnu
+    """
+    if n_inputs == 0 or not cover:
+        return None
+
+    def cover_value(bits):
+        hit = any(all(c == "-" or int(c) == b for c, b in zip(pattern, bits))
+                  for pattern, _ in cover)
+        return hit if cover[0][1] == "1" else not hit
+
+    table = [cover_value(bits)
+             for bits in itertools.product((0, 1), repeat=n_inputs)]
+
+    if n_inputs == 1:
+        candidates = {"BUF": lambda b: bool(b[0]), "NOT": lambda b: not b[0]}
+    else:
+        candidates = {
+            "AND": lambda b: all(b),
+            "OR": lambda b: any(b),
+            "NAND": lambda b: not all(b),
+            "NOR": lambda b: not any(b),
+            "XOR": lambda b: sum(b) % 2 == 1,
+            "XNOR": lambda b: sum(b) % 2 == 0,
+        }
+
+    for gate_type, function in candidates.items():
+        if all(function(bits) == value for bits, value in
+               zip(itertools.product((0, 1), repeat=n_inputs), table)):
+            return gate_type
+    return None
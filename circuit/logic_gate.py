@@ -10,8 +10,8 @@ class LogicGate:
         d'entrée du circuit, output pour la porte de sortie du circuit
         @param gate_id: Identifiant pour la porte logique
         """
-        assert gate_type in {"AND", "OR", "NOT", "NAND",
-                             "NOR", "XOR", "XNOR", "INPUT", "OUTPUT"}
+        assert gate_type in {"AND", "OR", "NOT", "NAND", "NOR", "XOR",
+                             "XNOR", "BUF", "INPUT", "OUTPUT"}
 
         self.gate_type = gate_type
         self.gate_id = gate_id or str(uuid.uuid4())
@@ -23,26 +23,29 @@ class LogicGate:
         return f"{self.gate_type}({self.gate_id[:4]})"
 
     def compute(self, inputs: list[bool]) -> bool:
-        """Calcul la porte logique à partir de ses entrées
+        """Calcul la porte logique à partir de ses entrées, sur toutes ses
+        entrées comme dans l'export BLIF (AND, OR et XOR à n entrées)
         @param inputs: Liste de booléen pour entrant dans la porte logique
 
         @return: Booléen résultat de l'opération de la porte logique
         """
 
         if self.gate_type == "AND":
-            return inputs[0] and inputs[1]
+            return all(inputs)
         elif self.gate_type == "OR":
-            return inputs[0] or inputs[1]
+            return any(inputs)
         elif self.gate_type == "NOT":
             return not inputs[0]
+        elif self.gate_type == "BUF":
+            return bool(inputs[0])
         elif self.gate_type == "NAND":
-            return not (inputs[0] and inputs[1])
+            return not all(inputs)
         elif self.gate_type == "NOR":
-            return not (inputs[0] or inputs[1])
+            return not any(inputs)
         elif self.gate_type == "XOR":
-            return inputs[0] ^ inputs[1]
+            return sum(map(bool, inputs)) % 2 == 1
         elif self.gate_type == "XNOR":
-            return not (inputs[0] ^ inputs[1])
+            return sum(map(bool, inputs)) % 2 == 0
         elif self.gate_type == "INPUT":
             raise ValueError("INPUT gate has no compute logic")
         elif self.gate_type == "OUTPUT":
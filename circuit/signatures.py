@@ -0,0 +1,219 @@
+from typing import Callable
+
+import networkx as nx
+import numpy as np
+
+from .colors import bcolors
+from .logic_circuit import LogicCircuit
+from .simulation import WORD_BITS, compute_words, popcount
+
+
+class IncrementalSimulator:
+    """Mots bit-parallèles de chaque porte d'un circuit, tenus à jour après
+    chaque modification : seules les portes du cône de sortie des portes
+    modifiées sont recalculées, et seulement si une de leurs entrées a
+    changé"""
+
+    def __init__(self, circuit: LogicCircuit,
+                 input_words: Callable[[str], np.ndarray], n_words: int):
+        """Simule le circuit et s'abonne à ses modifications
+        @param circuit: Circuit booléen suivi
+        @param input_words: Fonction donnant les mots d'une entrée selon son nom
+        @param n_words: Nombre de mots par porte
+        """
+        self.circuit = circuit
+        self.input_words = input_words
+        self.n_words = n_words
+        self._zeros = np.zeros(n_words, dtype=np.uint64)
+        self._zeros.setflags(write=False)
+
+        self.values = {}
+        self.dirty = set(circuit.graph.nodes)
+        self.cyclic = False
+
+        # Portes dont les mots ont changé, vidé par l'utilisateur
+        self.changed = set()
+
+        circuit.add_listener(self.on_event)
+
+    def close(self):
+        """Se désabonne des modifications du circuit"""
+        self.circuit.remove_listener(self.on_event)
+
+    def on_event(self, event: str, *args):
+        """Note les portes à recalculer (voir LogicCircuit.add_listener)
+        @param event: Nom de l'évènement
+        @param args: Arguments de l'évènement
+        """
+        if event == "add_gate":
+            self.dirty.add(args[0])
+        elif event == "remove_gate":
+            gate_id, preds, succs = args
+            self.values.pop(gate_id, None)
+            self.dirty.discard(gate_id)
+            self.changed.discard(gate_id)
+            self.dirty.update(succs)
+        elif event in {"connect", "disconnect"}:
+            self.dirty.add(args[1])
+
+    def update(self) -> bool:
+        """Recalcule les mots des portes en aval des modifications
+
+        @return: False si le cône modifié contient une boucle (les mots sont
+        alors invalides jusqu'à sa suppression)
+        """
+        if not self.dirty:
+            return not self.cyclic
+
+        graph = self.circuit.graph
+        cone = set(self.dirty)
+        stack = list(self.dirty)
+        while stack:
+            for succ in graph.successors(stack.pop()):
+                if succ not in cone:
+                    cone.add(succ)
+                    stack.append(succ)
+
+        # Toute boucle créée passe par une porte modifiée, elle est donc
+        # dans le cône
+        try:
+            order = list(nx.topological_sort(graph.subgraph(cone)))
+        except nx.NetworkXUnfeasible:
+            self.cyclic = True
+            return False
+        self.cyclic = False
+
+        changed = set()
+        for gate_id in order:
+            if gate_id not in self.dirty and \
+                    not any(p in changed for p in graph.predecessors(gate_id)):
+                continue
+            words = self._compute(gate_id)
+            previous = self.values.get(gate_id)
+            if previous is None or not np.array_equal(previous, words):
+                self.values[gate_id] = words
+                changed.add(gate_id)
+
+        self.changed |= changed
+        self.dirty = set()
+        return True
+
+    def _compute(self, gate_id: str) -> np.ndarray:
+        """Calcule les mots d'une porte à partir de ceux de ses entrées
+        @param gate_id: Identifiant de la porte logique
+
+        @return: Mots de la porte
+        """
+        graph = self.circuit.graph
+        gate_type = graph.nodes[gate_id]["gate"].gate_type
+        if gate_type == "INPUT":
+            return self.input_words(gate_id)
+
+        preds = list(graph.predecessors(gate_id))
+        if not preds:
+            return self._zeros
+        return compute_words(gate_type, [self.values[p] for p in preds])
+
+
+class SignatureTracker(IncrementalSimulator):
+    """Signatures de simulation de chaque porte d'un circuit (mots
+    bit-parallèles sur les motifs d'entrée d'un circuit cible), tenues à jour
+    après chaque modification (voir IncrementalSimulator). La comparaison des
+    sorties avec la cible ne dépend alors plus de la taille du circuit"""
+
+    def __init__(self, circuit: LogicCircuit, target):
+        """Simule le circuit et s'abonne à ses modifications
+        @param circuit: Circuit booléen suivi
+        @param target: Circuit cible (TargetCircuit) dont les motifs et les
+        signatures servent de référence
+        """
+        super().__init__(circuit, self._target_input_words,
+                         target.patterns.shape[1])
+        self.target = target
+        self.target_inputs = set(target.inputs)
+        self.target_outputs = set(target.outputs)
+
+        # Entrées / sorties du BLIF exporté : portes sans prédécesseur / sans
+        # successeur
+        graph = circuit.graph
+        self.sources = {n for n in graph.nodes if graph.in_degree(n) == 0}
+        self.sinks = {n for n in graph.nodes if graph.out_degree(n) == 0}
+
+    def on_event(self, event: str, *args):
+        """Note les portes à recalculer et l'interface du BLIF exporté (voir
+        LogicCircuit.add_listener)
+        @param event: Nom de l'évènement
+        @param args: Arguments de l'évènement
+        """
+        super().on_event(event, *args)
+        graph = self.circuit.graph
+        if event == "add_gate":
+            self.sources.add(args[0])
+            self.sinks.add(args[0])
+        elif event == "remove_gate":
+            gate_id, preds, succs = args
+            self.sources.discard(gate_id)
+            self.sinks.discard(gate_id)
+            self.sinks.update(p for p in preds if graph.out_degree(p) == 0)
+            self.sources.update(s for s in succs if graph.in_degree(s) == 0)
+        elif event == "connect":
+            from_id, to_id = args
+            self.sinks.discard(from_id)
+            self.sources.discard(to_id)
+        elif event == "disconnect":
+            from_id, to_id = args
+            if graph.out_degree(from_id) == 0:
+                self.sinks.add(from_id)
+            if graph.in_degree(to_id) == 0:
+                self.sources.add(to_id)
+
+    def _target_input_words(self, gate_id: str) -> np.ndarray:
+        """Mots d'une entrée selon les motifs de la cible
+        @param gate_id: Nom de l'entrée
+
+        @return: Mots de l'entrée, nuls si la cible n'a pas cette entrée
+        """
+        return self.target.input_words.get(gate_id, self._zeros)
+
+    def compare(self) -> bool | None:
+        """Compare le circuit au circuit cible, comme TargetCircuit.compare
+        mais sans resimuler le circuit
+
+        @return: False si les circuits sont différents, True s'ils sont
+        équivalents (table de vérité complète), None si la simulation ne
+        permet pas de conclure
+        """
+        if not self.update():
+            raise ValueError(f"{bcolors.WARNING}Le circuit contient une boucle")
+
+        if self.sources != self.target_inputs or \
+                self.sinks != self.target_outputs:
+            return False
+
+        for i, output in enumerate(self.target.outputs):
+            if not np.array_equal(self.values[output],
+                                  self.target.signatures[i]):
+                return False
+
+        return True if self.target.exhaustive else None
+
+    def match_fraction(self) -> float | None:
+        """Part des couples (sortie de la cible, motif) pour lesquels le
+        circuit donne déjà la bonne valeur, une sortie absente ne comptant
+        aucun motif correct
+
+        @return: Fraction entre 0 et 1, None si le circuit contient une boucle
+        """
+        if not self.update():
+            return None
+
+        outputs = self.target.outputs
+        if not outputs:
+            return 1.0
+
+        matching = 0
+        for i, output in enumerate(outputs):
+            if output in self.values:
+                matching += popcount(~(self.values[output]
+                                       ^ self.target.signatures[i]))
+        return matching / (len(outputs) * self.n_words * WORD_BITS)
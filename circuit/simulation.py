@@ -0,0 +1,232 @@
+import heapq
+
+import networkx as nx
+import numpy as np
+
+from .colors import bcolors
+
+# Simulation bit-parallèle : chaque signal est un tableau de mots de 64 bits,
+# le bit k du mot w correspond au motif d'entrée numéro 64 * w + k
+
+WORD_BITS = 64
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Motifs des 6 premières entrées pour une simulation exhaustive dans un mot
+_EXHAUSTIVE_WORDS = [
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+]
+
+
+def exhaustive_patterns(n_inputs: int) -> np.ndarray:
+    """Génère tous les motifs d'entrée possibles, le motif p donnant à
+    l'entrée i la valeur (p >> i) & 1
+    @param n_inputs: Nombre d'entrées du circuit
+
+    @return: Tableau (n_inputs, n_words) de mots uint64
+    """
+    n_words = max(1, (1 << n_inputs) // WORD_BITS)
+    patterns = np.zeros((n_inputs, n_words), dtype=np.uint64)
+    words = np.arange(n_words, dtype=np.uint64)
+
+    for i in range(n_inputs):
+        if i < 6:
+            patterns[i, :] = np.uint64(_EXHAUSTIVE_WORDS[i])
+        else:
+            bit = (words >> np.uint64(i - 6)) & np.uint64(1)
+            patterns[i, :] = np.where(bit == 1, ALL_ONES, np.uint64(0))
+    return patterns
+
+
+def random_patterns(n_inputs: int, n_words: int, seed: int = 0) -> np.ndarray:
+    """Génère des motifs d'entrée aléatoires reproductibles
+    @param n_inputs: Nombre d'entrées du circuit
+    @param n_words: Nombre de mots de 64 motifs
+    @param seed: Graine du générateur
+
+    @return: Tableau (n_inputs, n_words) de mots uint64
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 1 << 64, size=(n_inputs, n_words), dtype=np.uint64)
+
+
+def pattern_mask(n_patterns: int, n_words: int) -> np.ndarray:
+    """Masque des bits valides quand le nombre de motifs n'est pas un
+    multiple de 64
+    @param n_patterns: Nombre de motifs réellement simulés
+    @param n_words: Nombre de mots
+
+    @return: Tableau (n_words,) de mots uint64
+    """
+    mask = np.full(n_words, ALL_ONES, dtype=np.uint64)
+    if n_patterns < n_words * WORD_BITS:
+        mask[n_patterns // WORD_BITS:] = 0
+        if n_patterns % WORD_BITS:
+            mask[n_patterns // WORD_BITS] = np.uint64(
+                (1 << (n_patterns % WORD_BITS)) - 1)
+    return mask
+
+
+def popcount(words: np.ndarray) -> int:
+    """Compte le nombre de bits à 1 dans un tableau de mots
+    @param words: Tableau de mots uint64
+
+    @return: Nombre de bits à 1
+    """
+    return int(np.unpackbits(np.ascontiguousarray(words).view(np.uint8)).sum())
+
+
+def compute_words(gate_type: str, inputs: list[np.ndarray]) -> np.ndarray:
+    """Calcul bit-parallèle d'une porte logique, sur toutes ses entrées comme
+    dans l'export BLIF
+    @param gate_type: Type de la porte logique
+    @param inputs: Liste des mots des entrées de la porte
+
+    @return: Mots de sortie de la porte
+    """
+    if gate_type in {"OUTPUT", "BUF"}:
+        return inputs[0].copy()
+    if gate_type == "NOT":
+        return ~inputs[0]
+
+    if gate_type in {"AND", "NAND"}:
+        result = np.bitwise_and.reduce(inputs)
+    elif gate_type in {"OR", "NOR"}:
+        result = np.bitwise_or.reduce(inputs)
+    elif gate_type in {"XOR", "XNOR"}:
+        result = np.bitwise_xor.reduce(inputs)
+    else:
+        raise ValueError(f"Type de porte non simulable : {gate_type}")
+
+    if gate_type in {"NAND", "NOR", "XNOR"}:
+        result = ~result
+    return result
+
+
+def apply_fault_words(words: np.ndarray, fault: tuple[str, bool | None]) -> np.ndarray:
+    """Applique une faute (bitflip ou stuck) sur les mots d'un signal
+    @param words: Mots du signal sans faute
+    @param fault: Tuple (type de faute, valeur de la faute stuck)
+
+    @return: Mots du signal fautif
+    """
+    fault_type, stuck_value = fault
+    if fault_type == "bitflip":
+        return ~words
+    if fault_type == "stuck":
+        return np.full_like(words, ALL_ONES if stuck_value else 0)
+    raise ValueError(f"Type de faute inconnu : {fault_type}")
+
+
+class CompiledCircuit:
+    """Forme compilée d'un circuit booléen pour la simulation bit-parallèle :
+    portes dans l'ordre topologique, entrées des portes sous forme d'indices"""
+
+    def __init__(self, circuit):
+        """Compile le circuit booléen
+        @param circuit: Circuit booléen (LogicCircuit) à compiler
+        """
+        graph = circuit.graph
+        self.node_ids = list(nx.topological_sort(graph))
+        self.index = {gate_id: i for i, gate_id in enumerate(self.node_ids)}
+        self.types = [graph.nodes[n]["gate"].gate_type for n in self.node_ids]
+        self.fanins = [tuple(self.index[p] for p in graph.predecessors(n))
+                       for n in self.node_ids]
+        self.fanouts = [tuple(self.index[s] for s in graph.successors(n))
+                        for n in self.node_ids]
+
+        self.inputs = [i for i, t in enumerate(self.types) if t == "INPUT"]
+        self.outputs = [i for i, t in enumerate(self.types) if t == "OUTPUT"]
+        self.input_names = [self.node_ids[i] for i in self.inputs]
+        self.output_names = [self.node_ids[i] for i in self.outputs]
+
+        # Interface vue par le BLIF exporté (noeuds sans prédécesseurs ou
+        # sans successeurs)
+        self.blif_inputs = {n for n in self.node_ids if graph.in_degree(n) == 0}
+        self.blif_outputs = {n for n in self.node_ids if graph.out_degree(n) == 0}
+
+    def simulate(self, input_words: dict[str, np.ndarray],
+                 faults: dict[int, tuple[str, bool | None]] | None = None) -> np.ndarray:
+        """Simule le circuit sur des motifs bit-parallèles
+        @param input_words: Dictionnaire des mots de chaque entrée
+        @param faults: Fautes à injecter, indexées par indice de porte
+
+        @return: Tableau (n_portes, n_words) des mots de chaque porte
+        """
+        n_words = len(next(iter(input_words.values()))) if input_words else 1
+        values = np.zeros((len(self.node_ids), n_words), dtype=np.uint64)
+
+        for i, gate_type in enumerate(self.types):
+            if gate_type == "INPUT":
+                gate_id = self.node_ids[i]
+                if gate_id not in input_words:
+                    raise ValueError(
+                        f"{bcolors.WARNING}Pas d'input pour la porte logique: {gate_id}")
+                values[i] = input_words[gate_id]
+            elif self.fanins[i]:
+                values[i] = compute_words(
+                    gate_type, [values[p] for p in self.fanins[i]])
+
+            if faults and i in faults:
+                values[i] = apply_fault_words(values[i], faults[i])
+
+        return values
+
+    def simulate_outputs(self, input_words: dict[str, np.ndarray],
+                         faults: dict[int, tuple[str, bool | None]] | None = None) -> dict[str, np.ndarray]:
+        """Simule le circuit et ne retourne que les sorties
+        @param input_words: Dictionnaire des mots de chaque entrée
+        @param faults: Fautes à injecter, indexées par indice de porte
+
+        @return: Dictionnaire des mots de chaque sortie
+        """
+        values = self.simulate(input_words, faults)
+        return {self.node_ids[i]: values[i] for i in self.outputs}
+
+    def simulate_fault_cone(self, values: np.ndarray,
+                            faults: dict[int, tuple[str, bool | None]],
+                            start: list[int] | None = None) -> dict[int, np.ndarray]:
+        """Simule des fautes à partir de valeurs de référence, en ne
+        recalculant que les portes en aval dont une entrée a changé
+        @param values: Mots de chaque porte de référence, en général sans
+        faute (voir simulate)
+        @param faults: Fautes à appliquer, indexées par indice de porte
+        @param start: Portes à recalculer en premier, par défaut les portes
+        fautives (utile pour ajouter une faute à des valeurs déjà fautives)
+
+        @return: Dictionnaire indice de porte -> mots, pour les portes dont la
+        valeur diffère des valeurs de référence
+        """
+        changed = {}
+        heap = list(faults if start is None else start)
+        heapq.heapify(heap)
+        queued = set(heap)
+
+        while heap:
+            i = heapq.heappop(heap)
+
+            if self.types[i] == "INPUT" or not self.fanins[i]:
+                words = values[i]
+            else:
+                words = compute_words(
+                    self.types[i],
+                    [changed.get(p, values[p]) for p in self.fanins[i]])
+            if i in faults:
+                words = apply_fault_words(words, faults[i])
+
+            if np.array_equal(words, values[i]):
+                continue
+            changed[i] = words
+
+            # L'ordre topologique garantit que les successeurs ont un indice
+            # plus grand, chaque porte n'est donc calculée qu'une fois
+            for succ in self.fanouts[i]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, succ)
+
+        return changed
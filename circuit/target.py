@@ -0,0 +1,265 @@
+import hashlib
+import os
+import tempfile
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .blif import BlifModel, parse_blif, read_blif
+from .simulation import (ALL_ONES, CompiledCircuit, exhaustive_patterns,
+                         random_patterns)
+
+
+def evaluate_cover(fanin_words: list[np.ndarray], cover: list[tuple[str, str]],
+                   n_words: int) -> np.ndarray:
+    """Évalue en bit-parallèle une couverture BLIF (somme de produits)
+    @param fanin_words: Mots des entrées du noeud
+    @param cover: Couverture du noeud, liste de (motif, valeur de sortie)
+    @param n_words: Nombre de mots simulés
+
+    @return: Mots de sortie du noeud
+    """
+    result = np.zeros(n_words, dtype=np.uint64)
+    if not cover:
+        return result
+
+    for pattern, _ in cover:
+        term = np.full(n_words, ALL_ONES, dtype=np.uint64)
+        for literal, words in zip(pattern, fanin_words):
+            if literal == "1":
+                term &= words
+            elif literal == "0":
+                term &= ~words
+        result |= term
+
+    # Couverture de l'ensemble OFF : la sortie est le complément
+    if cover[0][1] == "0":
+        result = ~result
+    return result
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Se rattache à un segment de mémoire partagée sans que le processus
+    courant ne le supprime à sa sortie
+    @param name: Nom du segment
+
+    @return: Segment de mémoire partagée
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Python < 3.13 : pas d'option track. Le rattachement ne doit pas être
+    # enregistré auprès du resource tracker, qui peut être partagé avec le
+    # processus créateur : un désenregistrement après coup retirerait aussi
+    # l'enregistrement de ce dernier
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class TargetCircuit:
+    """Circuit cible préchargé en mémoire : interface, signatures de
+    simulation (table de vérité complète pour les petits circuits), hash
+    structurel et BLIF normalisé prêt pour ABC. Une fois construit, il n'est
+    plus nécessaire de relire le fichier cible"""
+
+    # Au delà de ce nombre d'entrées, la table de vérité est remplacée par des
+    # signatures sur des motifs aléatoires
+    EXHAUSTIVE_LIMIT = 16
+
+    def __init__(self, model: BlifModel, n_random_words: int = 64,
+                 seed: int = 0, signatures: np.ndarray | None = None):
+        """Précalcule le circuit cible
+        @param model: Modèle BLIF du circuit cible
+        @param n_random_words: Nombre de mots de motifs aléatoires utilisés
+        si la table de vérité est trop grande
+        @param seed: Graine des motifs aléatoires
+        @param signatures: Signatures des sorties déjà calculées sur ces
+        motifs (par exemple lues dans un corpus), la simulation est alors
+        évitée
+        """
+        self.model = model
+        self.name = model.name
+        self.inputs = list(model.inputs)
+        self.outputs = list(model.outputs)
+
+        self.blif_text = model.to_text()
+        self.structural_hash = hashlib.sha256(
+            self.blif_text.encode()).hexdigest()[:16]
+
+        self.exhaustive = len(self.inputs) <= self.EXHAUSTIVE_LIMIT
+        if self.exhaustive:
+            patterns = exhaustive_patterns(len(self.inputs))
+        else:
+            patterns = random_patterns(len(self.inputs), n_random_words, seed)
+        if signatures is None:
+            signatures = self._simulate(patterns)
+        self._set_tables(patterns, signatures)
+
+        self._shm = None
+        self._shm_finalizer = None
+        self._abc_filepath = None
+
+    @classmethod
+    def from_blif(cls, filepath: str, **kwargs) -> "TargetCircuit":
+        """Charge le circuit cible depuis un fichier BLIF
+        @param filepath: Chemin vers le fichier .blif du circuit cible
+
+        @return: Circuit cible précalculé
+        """
+        return cls(read_blif(filepath), **kwargs)
+
+    @classmethod
+    def from_text(cls, text: str, **kwargs) -> "TargetCircuit":
+        """Charge le circuit cible depuis un texte BLIF déjà en mémoire
+        @param text: Contenu BLIF du circuit cible
+
+        @return: Circuit cible précalculé
+        """
+        return cls(parse_blif(text), **kwargs)
+
+    def _set_tables(self, patterns: np.ndarray, signatures: np.ndarray):
+        """Enregistre les tableaux précalculés en lecture seule
+        @param patterns: Motifs d'entrée (n_inputs, n_words)
+        @param signatures: Signatures des sorties (n_outputs, n_words)
+        """
+        patterns.setflags(write=False)
+        signatures.setflags(write=False)
+        self.patterns = patterns
+        self.signatures = signatures
+        self.input_words = {name: patterns[i]
+                            for i, name in enumerate(self.inputs)}
+
+    def _simulate(self, patterns: np.ndarray) -> np.ndarray:
+        """Simule le modèle BLIF du circuit cible
+        @param patterns: Motifs d'entrée (n_inputs, n_words)
+
+        @return: Signatures des sorties (n_outputs, n_words)
+        """
+        n_words = patterns.shape[1]
+        values = {name: patterns[i] for i, name in enumerate(self.inputs)}
+
+        for fanins, node, cover in self.model.nodes:
+            values[node] = evaluate_cover([values[f] for f in fanins], cover,
+                                          n_words)
+
+        signatures = np.zeros((len(self.outputs), n_words), dtype=np.uint64)
+        for i, output in enumerate(self.outputs):
+            signatures[i] = values[output]
+        return signatures
+
+    def compare(self, circuit) -> bool | None:
+        """Compare un circuit candidat au circuit cible sans passer par ABC
+        @param circuit: Circuit booléen (LogicCircuit) candidat
+
+        @return: False si les circuits sont différents, True s'ils sont
+        équivalents (table de vérité complète), None si la simulation ne
+        permet pas de conclure
+        """
+        compiled = CompiledCircuit(circuit)
+
+        # Les entrées / sorties du BLIF exporté doivent correspondre
+        if compiled.blif_inputs != set(self.inputs) or \
+                compiled.blif_outputs != set(self.outputs):
+            return False
+
+        values = compiled.simulate(self.input_words)
+        for i, output in enumerate(self.outputs):
+            if not np.array_equal(values[compiled.index[output]],
+                                  self.signatures[i]):
+                return False
+
+        return True if self.exhaustive else None
+
+    @property
+    def abc_filepath(self) -> str:
+        """Chemin vers un BLIF normalisé du circuit cible pour ABC, écrit une
+        seule fois par processus
+
+        @return: Chemin vers le fichier .blif
+        """
+        if self._abc_filepath is None:
+            fd, path = tempfile.mkstemp(suffix=".blif")
+            with os.fdopen(fd, "w") as f:
+                f.write(self.blif_text)
+            self._abc_filepath = path
+            weakref.finalize(self, os.remove, path)
+        return self._abc_filepath
+
+    def to_shared_memory(self):
+        """Déplace les motifs et signatures dans un segment de mémoire
+        partagée. Les copies envoyées aux workers (pickle) s'y rattachent en
+        lecture seule au lieu de dupliquer les tableaux"""
+        if self._shm is not None:
+            return
+
+        patterns, signatures = self.patterns, self.signatures
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, patterns.nbytes + signatures.nbytes))
+        self._shm = shm
+        self._set_tables(*self._shm_arrays(patterns.shape, signatures.shape,
+                                           writable_init=(patterns, signatures)))
+        self._shm_finalizer = weakref.finalize(self, shm.unlink)
+
+    def _shm_arrays(self, patterns_shape: tuple, signatures_shape: tuple,
+                    writable_init: tuple | None = None) -> tuple:
+        """Crée les vues numpy sur le segment de mémoire partagée
+        @param patterns_shape: Forme du tableau des motifs
+        @param signatures_shape: Forme du tableau des signatures
+        @param writable_init: Tableaux à recopier dans le segment (créateur)
+
+        @return: Tuple (motifs, signatures)
+        """
+        offset = int(np.prod(patterns_shape)) * 8
+        patterns = np.ndarray(patterns_shape, dtype=np.uint64,
+                              buffer=self._shm.buf)
+        signatures = np.ndarray(signatures_shape, dtype=np.uint64,
+                                buffer=self._shm.buf, offset=offset)
+        if writable_init is not None:
+            patterns[...] = writable_init[0]
+            signatures[...] = writable_init[1]
+        return patterns, signatures
+
+    def close(self):
+        """Libère le segment de mémoire partagée (supprimé si ce processus
+        l'a créé)"""
+        if self._shm is None:
+            return
+        patterns, signatures = self.patterns.copy(), self.signatures.copy()
+        self._set_tables(patterns, signatures)
+        self._shm.close()
+        if self._shm_finalizer is not None:
+            self._shm_finalizer()
+        self._shm = None
+        self._shm_finalizer = None
+
+    def __getstate__(self) -> dict:
+        """Prépare la sérialisation : en mémoire partagée, seuls le nom du
+        segment et les formes des tableaux sont transmis"""
+        state = self.__dict__.copy()
+        state["_abc_filepath"] = None
+        state["_shm_finalizer"] = None
+        state.pop("input_words")
+        if self._shm is not None:
+            state["_shm"] = self._shm.name
+            state["patterns"] = self.patterns.shape
+            state["signatures"] = self.signatures.shape
+        return state
+
+    def __setstate__(self, state: dict):
+        """Reconstruit le circuit cible, en se rattachant à la mémoire
+        partagée si besoin"""
+        self.__dict__.update(state)
+        if isinstance(self._shm, str):
+            self._shm = _attach_shared_memory(self._shm)
+            self._set_tables(*self._shm_arrays(state["patterns"],
+                                               state["signatures"]))
+        else:
+            self._set_tables(self.patterns, self.signatures)
+
@@ -1 +1,3 @@
 from .gym_env import *
+from .graph_observation import *
+from .evaluation import *
@@ -0,0 +1,161 @@
+import functools
+import json
+import time
+
+import gymnasium as gym
+import numpy as np
+
+
+def evaluate_policy(model, env_fns: list, n_episodes: int = 100,
+                    seed: int = 0, deterministic: bool = True,
+                    asynchronous: bool = True) -> dict:
+    """Évalue une politique (MaskablePPO) sur plusieurs épisodes graines,
+    répartis sur plusieurs environnements. Les prédictions de tous les
+    environnements sont faites en un seul appel à model.predict par étape
+    @param model: Modèle entraîné, avec predict(obs, action_masks=...)
+    @param env_fns: Fonctions créant chacune un LogicCircuitEnv (une par
+    environnement)
+    @param n_episodes: Nombre d'épisodes évalués
+    @param seed: Graine du premier épisode, l'épisode k utilise seed + k
+    quel que soit l'environnement qui l'exécute
+    @param deterministic: Actions déterministes de la politique
+    @param asynchronous: Environnements dans des processus séparés
+    (AsyncVectorEnv), sinon dans ce processus (SyncVectorEnv)
+
+    @return: Rapport (résumé et résultats de chaque épisode)
+    """
+    vector_env = gym.vector.AsyncVectorEnv if asynchronous \
+        else gym.vector.SyncVectorEnv
+    # Réinitialisations gérées ici pour contrôler la graine de chaque épisode
+    envs = vector_env([functools.partial(_make_env, fn) for fn in env_fns],
+                      autoreset_mode=gym.vector.AutoresetMode.DISABLED)
+    n_envs = envs.num_envs
+
+    episodes = []
+    start = time.perf_counter()
+    try:
+        # Épisode exécuté par chaque environnement, None quand il n'y en a
+        # plus à lancer
+        running = [k if k < n_episodes else None for k in range(n_envs)]
+        next_episode = n_envs
+        returns = np.zeros(n_envs)
+        lengths = np.zeros(n_envs, dtype=np.int64)
+
+        obs, _ = envs.reset(seed=[seed + k for k in range(n_envs)])
+
+        while any(k is not None for k in running):
+            masks = np.stack(envs.call("get_action_mask"))
+            actions, _ = model.predict(obs, action_masks=masks,
+                                       deterministic=deterministic)
+            obs, rewards, terminated, truncated, infos = envs.step(actions)
+            returns += rewards
+            lengths += 1
+
+            finished = terminated | truncated
+            if not finished.any():
+                continue
+
+            seeds = [None] * n_envs
+            for i in np.flatnonzero(finished):
+                if running[i] is not None:
+                    episodes.append({
+                        "episode": running[i],
+                        "seed": seed + running[i],
+                        "success": bool(terminated[i]),
+                        "steps": int(lengths[i]),
+                        "return": float(returns[i]),
+                        "gate_count": int(infos["gate_count"][i]),
+                        "critical_path": _optional_int(
+                            infos["critical_path"][i])})
+
+                # Environnement suivant : nouvel épisode ou inactif
+                running[i] = next_episode if next_episode < n_episodes \
+                    else None
+                if running[i] is not None:
+                    seeds[i] = seed + running[i]
+                    next_episode += 1
+                returns[i] = 0
+                lengths[i] = 0
+
+            obs, _ = envs.reset(seed=seeds, options={"reset_mask": finished})
+    finally:
+        envs.close()
+
+    episodes.sort(key=lambda e: e["episode"])
+    return {"summary": summarize(episodes, time.perf_counter() - start),
+            "episodes": episodes}
+
+
+def summarize(episodes: list[dict], duration: float | None = None) -> dict:
+    """Calcule les métriques agrégées d'une évaluation
+    @param episodes: Résultats de chaque épisode (voir evaluate_policy)
+    @param duration: Durée de l'évaluation en secondes
+
+    @return: Dictionnaire des métriques
+    """
+    successes = [e for e in episodes if e["success"]]
+    steps = [e["steps"] for e in successes]
+
+    summary = {
+        "n_episodes": len(episodes),
+        "success_rate": len(successes) / len(episodes) if episodes else 0.0,
+        "mean_return": _mean([e["return"] for e in episodes]),
+        "mean_steps_to_equivalence": _mean(steps),
+        "median_steps_to_equivalence":
+            float(np.median(steps)) if steps else None,
+        "mean_final_gate_count": _mean([e["gate_count"] for e in episodes]),
+        "mean_final_gate_count_success":
+            _mean([e["gate_count"] for e in successes]),
+    }
+    if duration is not None:
+        summary["duration"] = duration
+        summary["episodes_per_second"] = len(episodes) / duration \
+            if duration > 0 else None
+    return summary
+
+
+def _mean(values: list) -> float | None:
+    """@return: Moyenne des valeurs, None si la liste est vide"""
+    return float(np.mean(values)) if values else None
+
+
+def _optional_int(value) -> int | None:
+    """@return: Valeur convertie en entier, None si elle est négative"""
+    return None if value < 0 else int(value)
+
+
+class _EvaluationInfo(gym.Wrapper):
+    """Remplace les infos de l'environnement par les seules métriques
+    évaluées, en valeurs numériques : les environnements vectorisés
+    regroupent les infos par clé dans des tableaux, ce qui échoue avec des
+    valeurs None ou des dictionnaires de clés variables"""
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        return obs, self._info(info)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        return obs, reward, terminated, truncated, self._info(info)
+
+    @staticmethod
+    def _info(info: dict) -> dict:
+        """@return: Nombre de portes et chemin critique (-1 si boucle)"""
+        critical_path = info["metrics"]["critical_path"]
+        return {"gate_count": info["metrics"]["gate_count"],
+                "critical_path": -1 if critical_path is None else critical_path}
+
+
+def _make_env(env_fn) -> gym.Env:
+    """@return: Environnement créé par env_fn, aux infos simplifiées"""
+    return _EvaluationInfo(env_fn())
+
+
+def write_report(report: dict, filepath: str, **metadata):
+    """Écrit un rapport d'évaluation au format JSON
+    @param report: Rapport retourné par evaluate_policy
+    @param filepath: Chemin du fichier JSON
+    @param metadata: Informations ajoutées au rapport (modèle, config...)
+    """
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({**metadata, **report}, f, indent=2)
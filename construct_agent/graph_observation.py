@@ -0,0 +1,166 @@
+import gymnasium as gym
+import numpy as np
+
+from circuit import LogicCircuit
+
+
+class GraphObservation:
+    """Observation creuse d'un circuit sous forme de graphe : une ligne de
+    caractéristiques par porte logique et une liste d'arêtes (indices source,
+    destination). Elle est maintenue de manière incrémentale grâce aux
+    listeners du circuit, sans matrice d'adjacence ni limite de taille."""
+
+    def __init__(self, circuit: LogicCircuit, gate_types: list[str]):
+        """Construit l'observation initiale et s'abonne aux modifications du
+        circuit
+        @param circuit: Circuit booléen observé
+        @param gate_types: Types de portes logiques encodés en one-hot, les
+        types INPUT et OUTPUT sont ajoutés à la fin
+        """
+        self.circuit = circuit
+        self.type_index = {t: i for i, t in enumerate(
+            list(gate_types) + ["INPUT", "OUTPUT"])}
+
+        # Caractéristiques : one-hot du type, fan-in, fan-out
+        self.n_features = len(self.type_index) + 2
+        self.fanin_col = len(self.type_index)
+        self.fanout_col = self.fanin_col + 1
+
+        self.node_ids = []
+        self.node_index = {}
+        self.features = np.zeros((16, self.n_features), dtype=np.float32)
+
+        self.edge_keys = []
+        self.edge_index = {}
+        self.edge_links = np.zeros((16, 2), dtype=np.int64)
+
+        for gate_id in circuit.graph.nodes:
+            self._add_node(gate_id)
+        for from_id, to_id in circuit.graph.edges:
+            self._add_edge(from_id, to_id)
+
+        circuit.add_listener(self.on_event)
+
+    @staticmethod
+    def space(gate_types: list[str]) -> gym.spaces.Graph:
+        """Espace d'observation Gymnasium correspondant
+        @param gate_types: Types de portes logiques encodés en one-hot
+
+        @return: Espace Graph (caractéristiques des noeuds, arêtes d'un
+        seul type)
+        """
+        # one-hot des types + INPUT / OUTPUT, fan-in, fan-out
+        n_features = len(gate_types) + 4
+        node_space = gym.spaces.Box(low=0, high=np.inf,
+                                    shape=(n_features,), dtype=np.float32)
+        # Gymnasium n'accepte les liens des arêtes qu'avec un espace d'arêtes
+        return gym.spaces.Graph(node_space=node_space,
+                                edge_space=gym.spaces.Discrete(1))
+
+    def observation(self) -> gym.spaces.GraphInstance:
+        """Retourne une copie de l'observation courante
+
+        @return: Instance de graphe (noeuds, arêtes, liens des arêtes)
+        """
+        n_edges = len(self.edge_keys)
+        return gym.spaces.GraphInstance(
+            nodes=self.features[:len(self.node_ids)].copy(),
+            edges=np.zeros(n_edges, dtype=np.int64),
+            edge_links=self.edge_links[:n_edges].copy())
+
+    def close(self):
+        """Se désabonne des modifications du circuit"""
+        self.circuit.remove_listener(self.on_event)
+
+    def on_event(self, event: str, *args):
+        """Met à jour l'observation après une modification du circuit
+        @param event: Nom de l'évènement (voir LogicCircuit.add_listener)
+        @param args: Arguments de l'évènement
+        """
+        if event == "add_gate":
+            self._add_node(args[0])
+        elif event == "remove_gate":
+            gate_id, preds, succs = args
+            for pred in preds:
+                self._remove_edge(pred, gate_id)
+            for succ in succs:
+                self._remove_edge(gate_id, succ)
+            self._remove_node(gate_id)
+        elif event == "connect":
+            self._add_edge(*args)
+        elif event == "disconnect":
+            self._remove_edge(*args)
+
+    def _add_node(self, gate_id: str):
+        """Ajoute une ligne pour une nouvelle porte
+        @param gate_id: Identifiant de la porte logique
+        """
+        row = len(self.node_ids)
+        if row == len(self.features):
+            self.features = np.concatenate(
+                [self.features, np.zeros_like(self.features)])
+
+        gate = self.circuit.graph.nodes[gate_id]["gate"]
+        self.features[row] = 0
+        type_idx = self.type_index.get(gate.gate_type)
+        if type_idx is not None:
+            self.features[row, type_idx] = 1
+
+        self.node_ids.append(gate_id)
+        self.node_index[gate_id] = row
+
+    def _remove_node(self, gate_id: str):
+        """Supprime la ligne d'une porte en la remplaçant par la dernière
+        @param gate_id: Identifiant de la porte logique (sans arêtes)
+        """
+        row = self.node_index.pop(gate_id)
+        last_id = self.node_ids.pop()
+
+        if last_id != gate_id:
+            last = len(self.node_ids)
+            self.features[row] = self.features[last]
+            self.node_ids[row] = last_id
+            self.node_index[last_id] = row
+
+            # Les arêtes de la porte déplacée pointent vers sa nouvelle ligne
+            graph = self.circuit.graph
+            for pred in graph.predecessors(last_id):
+                self.edge_links[self.edge_index[(pred, last_id)], 1] = row
+            for succ in graph.successors(last_id):
+                self.edge_links[self.edge_index[(last_id, succ)], 0] = row
+
+    def _add_edge(self, from_id: str, to_id: str):
+        """Ajoute une arête et met à jour les fan-in / fan-out
+        @param from_id: Identifiant de la porte d'origine
+        @param to_id: Identifiant de la porte de destination
+        """
+        pos = len(self.edge_keys)
+        if pos == len(self.edge_links):
+            self.edge_links = np.concatenate(
+                [self.edge_links, np.zeros_like(self.edge_links)])
+
+        src, dst = self.node_index[from_id], self.node_index[to_id]
+        self.edge_links[pos] = (src, dst)
+        self.edge_keys.append((from_id, to_id))
+        self.edge_index[(from_id, to_id)] = pos
+
+        self.features[src, self.fanout_col] += 1
+        self.features[dst, self.fanin_col] += 1
+
+    def _remove_edge(self, from_id: str, to_id: str):
+        """Supprime une arête en la remplaçant par la dernière
+        @param from_id: Identifiant de la porte d'origine
+        @param to_id: Identifiant de la porte de destination
+        """
+        pos = self.edge_index.pop((from_id, to_id))
+        last_key = self.edge_keys.pop()
+        src, dst = self.edge_links[pos]
+
+        if last_key != (from_id, to_id):
+            last = len(self.edge_keys)
+            self.edge_links[pos] = self.edge_links[last]
+            self.edge_keys[pos] = last_key
+            self.edge_index[last_key] = pos
+
+        self.features[src, self.fanout_col] -= 1
+        self.features[dst, self.fanin_col] -= 1
@@ -3,13 +3,14 @@ import tempfile
 
 import gymnasium as gym
 import numpy as np
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from circuit import LogicCircuit, LogicGate, check_circuits
+from circuit import (BDDEquivalenceChecker, CircuitAnalysis, CircuitCorpus,
+                     LogicCircuit, LogicGate, SignatureTracker,
+                     TargetCircuit, bcolors, check_circuits)
 import networkx as nx
 
+from attacker import RobustnessEvaluator
+from .graph_observation import GraphObservation
+
 
 class LogicCircuitEnv(gym.Env):
     """Environnement Gym pour la construction de circuits booléens.
@@ -18,14 +19,58 @@ class LogicCircuitEnv(gym.Env):
     même en présence de fautes injectées par un attaquant.
     """
 
-    def __init__(self, target_filepath: str, abc_path: str,
-                 render_mode: str | None = None):
+    # Nombre de cibles du corpus (et de leurs BDD) gardées en mémoire
+    TARGET_CACHE_SIZE = 32
+
+    def __init__(self, target_filepath: str | None, abc_path: str,
+                 render_mode: str | None = None,
+                 target: TargetCircuit | None = None, max_gates: int = 20,
+                 action_mode: str = "discrete",
+                 observation_mode: str = "dense",
+                 efficiency_weight: float = 0.0,
+                 robustness_weight: float = 0.0,
+                 robustness_kwargs: dict | None = None,
+                 bdd_max_nodes: int | None = 200_000,
+                 verbose: bool = True,
+                 corpus: CircuitCorpus | None = None,
+                 corpus_ids: list[int] | None = None,
+                 match_weight: float = 0.0):
         """
         Initialise l'environnement de construction de circuits
 
         @param target_circuit_path: Chemin vers le fichier .blif du circuit cible
         @param abc_path: Chemin vers l'exécutable ABC
+        @param target: Circuit cible déjà précalculé (partagé entre plusieurs
+        environnements), sinon il est chargé depuis target_filepath
+        @param max_gates: Nombre maximal de portes logiques du circuit
+        @param action_mode: "discrete" pour une action unique parmi toutes
+        les combinaisons, "factored" pour une action MultiDiscrete (type
+        d'action, type de porte, source, cible) dont la taille du masque
+        croît linéairement avec max_gates
+        @param observation_mode: "dense" pour le vecteur applati avec matrice
+        d'adjacence, "graph" pour un graphe creux (caractéristiques des portes
+        et liste d'arêtes) maintenu de manière incrémentale et sans limite de
+        taille
+        @param efficiency_weight: Poids de la pénalité d'efficacité (nombre de
+        portes et chemin critique) appliquée aux circuits valides
+        @param robustness_weight: Poids du bonus de robustesse aux fautes
+        simples (part des fautes masquées) accordé aux circuits valides
+        @param robustness_kwargs: Paramètres du RobustnessEvaluator (nombre de
+        fautes, de motifs, budget de temps...)
+        @param bdd_max_nodes: Limite de noeuds des BDD utilisés pour vérifier
+        l'équivalence quand la table de vérité de la cible est trop grande
+        (au delà, ABC est utilisé), None pour toujours utiliser ABC
+        @param verbose: Affiche l'action et la récompense à chaque étape
+        @param corpus: Corpus de circuits cibles, une cible différente est
+        alors tirée à chaque épisode (target_filepath n'est pas utilisé)
+        @param corpus_ids: Identifiants des cibles du corpus à utiliser, par
+        défaut celles dont le circuit initial tient dans max_gates
+        @param match_weight: Poids du bonus de correspondance partielle
+        (part des bits des sorties déjà égaux à ceux de la cible sur les
+        motifs simulés) accordé aux circuits valides
         """
+        assert action_mode in {"discrete", "factored"}
+        assert observation_mode in {"dense", "graph"}
         # Informations pour l'environnement Gymnasium
         super().__init__()
         self.metadata['render_modes'] = ['rgb_array', 'human']
@@ -38,6 +83,33 @@ class LogicCircuitEnv(gym.Env):
 
         self.target_filepath = target_filepath
         self.abc_path = abc_path
+        self.verbose = verbose
+
+        self.bdd_max_nodes = bdd_max_nodes
+        self.corpus = corpus
+        self.target_id = None
+        self.bdd_checker = None
+        self._targets = {}
+
+        if corpus is not None:
+            if corpus_ids is None:
+                # Le circuit initial compte les entrées, puis une porte et
+                # une sortie par sortie de la cible, et doit laisser au moins
+                # une place libre pour que l'agent puisse ajouter une porte
+                index = corpus.index
+                size = index["n_inputs"].astype(np.int64) + \
+                    2 * index["n_outputs"].astype(np.int64)
+                corpus_ids = np.flatnonzero(size < max_gates)
+            self.corpus_ids = np.asarray(corpus_ids, dtype=np.int64)
+            if not len(self.corpus_ids):
+                raise ValueError(
+                    f"{bcolors.WARNING}Aucune cible du corpus ne tient dans "
+                    f"{max_gates} portes")
+            self._set_target(int(self.corpus_ids[0]))
+        else:
+            # Le circuit cible est analysé une seule fois, le fichier n'est
+            # plus relu ensuite
+            self.target = target or TargetCircuit.from_blif(target_filepath)
 
         self.circuit = LogicCircuit()
         self.faulty_circuit = None
@@ -51,7 +123,8 @@ class LogicCircuitEnv(gym.Env):
         # le 2nd est le choix de la porte (utile que pour l'action d'ajout)
         # le 3e et 4e c'est l'id encodée de la porte (0 à max gates)
 
-        self.max_gates = 20
+        self.max_gates = max_gates
+        self.action_mode = action_mode
 
         # Définition d'un nombre d'actions possibles max car l'action space
         # doit être constant mais le nombre d'action possible est dynamique,
@@ -59,18 +132,42 @@ class LogicCircuitEnv(gym.Env):
         self.max_actions = 4 * len(self.available_gates) * \
             self.max_gates * self.max_gates
 
-        self.action_space = gym.spaces.Discrete(self.max_actions)
-
-        # Définition d'une matrice max_gates * (nombre type + connexions) pour
-        # enregistrer l'état du circuit
-        self.observation_space = gym.spaces.Box(
-            low=0,
-            high=1,
-            shape=(self.calculate_flat_dim(),),
-            dtype=np.float32
-        )
+        if self.action_mode == "factored":
+            # Chaque composante de l'action est choisie et masquée
+            # séparément (masque de taille 4 + types + 2 * max_gates)
+            self.action_space = gym.spaces.MultiDiscrete(
+                [4, len(self.available_gates), self.max_gates, self.max_gates])
+        else:
+            self.action_space = gym.spaces.Discrete(self.max_actions)
+
+        self.observation_mode = observation_mode
+        if self.observation_mode == "graph":
+            self.observation_space = GraphObservation.space(
+                self.available_gates)
+        else:
+            # Définition d'une matrice max_gates * (nombre type + connexions)
+            # pour enregistrer l'état du circuit
+            self.observation_space = gym.spaces.Box(
+                low=0,
+                high=1,
+                shape=(self.calculate_flat_dim(),),
+                dtype=np.float32
+            )
+
+        self.efficiency_weight = efficiency_weight
+        self.robustness_weight = robustness_weight
+        self.match_weight = match_weight
+        self.robustness_kwargs = robustness_kwargs or {}
 
         self.circuit = None
+        self.graph_obs = None
+        self.analysis = None
+        self.robustness = None
+        self.robustness_score = None
+        # Scores de robustesse par structure, gardés d'un épisode à l'autre
+        self.robustness_cache = {}
+        self.signatures = None
+        self.signature_match = None
         self.valid_actions = []
 
 
@@ -83,26 +180,103 @@ class LogicCircuitEnv(gym.Env):
         """
         super().reset(seed=seed)
         self.current_steps = 0
-        self.circuit = LogicCircuit()
 
-        # Ajout de base : deux inputs et une sortie, une porte AND
-        self.circuit.add_gate(LogicGate("INPUT", "A"))
-        self.circuit.add_gate(LogicGate("INPUT", "B"))
-        self.circuit.add_gate(LogicGate("AND", "G1"))
-        self.circuit.add_gate(LogicGate("OUTPUT", "OUT"))
+        # Nouvelle cible tirée dans le corpus à chaque épisode
+        if self.corpus is not None:
+            self._set_target(int(self.np_random.choice(self.corpus_ids)))
 
-        self.circuit.connect("A", "G1")
-        self.circuit.connect("B", "G1")
-        self.circuit.connect("G1", "OUT")
+        self.circuit = self._initial_circuit()
 
         # Ajout d'une faute pour le circuit afin de l'aider à s'améliorer
         # self.faulty_circuit = FaultyCircuit(self.circuit)
         # self.faulty_circuit.add_fault("OUT", "bitflip")
 
+        if self.observation_mode == "graph":
+            self.graph_obs = GraphObservation(self.circuit,
+                                              self.available_gates)
+
+        # Métriques d'efficacité tenues à jour à chaque modification
+        self.analysis = CircuitAnalysis(self.circuit)
+
+        # Signatures de simulation des portes sur les motifs de la cible,
+        # mises à jour sur le seul cône de sortie de chaque modification
+        self.signatures = SignatureTracker(self.circuit, self.target)
+        self.signature_match = None
+
+        # Robustesse évaluée uniquement si elle compte dans la récompense
+        self.robustness_score = None
+        if self.robustness_weight > 0:
+            self.robustness = RobustnessEvaluator(
+                self.circuit, cache=self.robustness_cache,
+                **self.robustness_kwargs)
+
         obs = self._get_obs()
-        info = {"action_mask": self.get_action_mask()}
+        info = self._get_info()
         return obs, info
 
+    def _get_bdd_checker(self) -> BDDEquivalenceChecker | None:
+        """
+        Sans table de vérité complète, le BDD de la cible est construit une
+        fois pour éviter un appel à ABC par vérification. Il n'est construit
+        qu'à la première vérification que la simulation ne tranche pas, les
+        épisodes qui n'en ont pas besoin n'en paient pas le coût
+
+        @return: Vérificateur BDD, None si inutile ou désactivé
+        """
+        if self.bdd_checker is None and not self.target.exhaustive \
+                and self.bdd_max_nodes is not None:
+            self.bdd_checker = BDDEquivalenceChecker(
+                self.target, max_nodes=self.bdd_max_nodes)
+            if self.target_id is not None:
+                self._targets[self.target_id][1] = self.bdd_checker
+        return self.bdd_checker
+
+    def _set_target(self, target_id: int):
+        """
+        Change de circuit cible parmi ceux du corpus, les dernières cibles
+        utilisées sont gardées avec leur BDD (s'il a été construit), la moins
+        récemment utilisée étant retirée en premier
+
+        @param target_id: Identifiant de la cible dans le corpus
+        """
+        if target_id in self._targets:
+            # Cible replacée en fin de cache (la plus récente)
+            self._targets[target_id] = self._targets.pop(target_id)
+        else:
+            if len(self._targets) >= self.TARGET_CACHE_SIZE:
+                self._targets.pop(next(iter(self._targets)))
+            self._targets[target_id] = [self.corpus.target(target_id), None]
+
+        self.target_id = target_id
+        self.target, self.bdd_checker = self._targets[target_id]
+
+    def _initial_circuit(self) -> LogicCircuit:
+        """
+        Circuit de départ : les entrées et sorties de la cible, chaque sortie
+        étant reliée à toutes les entrées par une porte AND (un buffer si la
+        cible n'a qu'une entrée)
+
+        @return: Circuit initial
+        """
+        circuit = LogicCircuit()
+        for name in self.target.inputs:
+            circuit.add_gate(LogicGate("INPUT", name))
+
+        for k, name in enumerate(self.target.outputs):
+            # Identifiant G1, G2... sauf s'il est déjà pris par la cible
+            gate_id = f"G{k + 1}"
+            if gate_id in self.target.inputs or gate_id in self.target.outputs:
+                gate_id = None
+            gate = LogicGate("AND" if len(self.target.inputs) > 1 else "BUF",
+                             gate_id)
+            circuit.add_gate(gate)
+            circuit.add_gate(LogicGate("OUTPUT", name))
+
+            for input_name in self.target.inputs:
+                circuit.connect(input_name, gate.gate_id)
+            circuit.connect(gate.gate_id, name)
+        return circuit
+
     def step(self, action):
         """
         Applique une action de modification sur le circuit
@@ -123,7 +297,7 @@ class LogicCircuitEnv(gym.Env):
                             i in self.id_to_index.items()}
 
         try:
-            actual_action = self.valid_actions[action]
+            actual_action = self._decode_action(action)
             action_type, action_gate_type, action_id1, action_id2 = actual_action
             source_id = self.index_to_id.get(action_id1, f"G{action_id1}")
             target_id = self.index_to_id.get(action_id2, f"G{action_id2}")
@@ -151,27 +325,40 @@ class LogicCircuitEnv(gym.Env):
                 reward = 1
 
             if self.circuit.is_valid():
-                # Sauvegarder le circuit + comparer avec les fonctionnalités
-                # avec le circuit de base
-                tmp_fd, tmp_path = tempfile.mkstemp(suffix=".blif")
-                os.close(tmp_fd)
-                self.circuit.export_to_blif(tmp_path, "tmp")
-
-                if check_circuits(tmp_path, self.target_filepath,
-                                  self.abc_path):
+                # Comparaison des signatures tenues à jour avec celles de la
+                # cible, puis par BDD, ABC n'est appelé qu'en dernier recours
+                equivalent = self.signatures.compare()
+                if equivalent is None:
+                    bdd_checker = self._get_bdd_checker()
+                    if bdd_checker is not None:
+                        equivalent = bdd_checker.check(self.circuit)
+                if equivalent is None:
+                    equivalent = self._check_with_abc()
+
+                if equivalent:
                     reward = 10
                     done = True
                 else:
                     reward = 5
 
-                os.remove(tmp_path)
+                reward -= self.efficiency_weight * self._efficiency_cost()
+
+                if self.match_weight > 0:
+                    self.signature_match = self.signatures.match_fraction()
+                    reward += self.match_weight * self.signature_match
+
+                if self.robustness is not None:
+                    self.robustness_score = self.robustness.score()
+                    if self.robustness_score is not None:
+                        reward += self.robustness_weight * self.robustness_score
 
         except Exception:
             reward = -2
 
-        print(f"Action RL: {action}, reward: {reward:.2f}, current_steps: {
-              self.current_steps}")
-        info = {"action_mask": self.get_action_mask()}
+        if self.verbose:
+            print(f"Action RL: {action}, reward: {reward:.2f}, current_steps: {
+                  self.current_steps}")
+        info = self._get_info()
 
         # Optimisation pour le rendu vidéo, sinon le cache est trop grand et ça
         # ralenti l'entrainement
@@ -180,13 +367,57 @@ class LogicCircuitEnv(gym.Env):
 
         return self._get_obs(), reward, done, truncated, info
 
+    def _get_info(self) -> dict:
+        """
+        Informations supplémentaires : masque d'actions, métriques
+        d'efficacité, dernières robustesse et correspondance partielle
+        calculées du circuit
+
+        @return: Dictionnaire d'informations
+        """
+        return {"action_mask": self.get_action_mask(),
+                "metrics": self.analysis.metrics(),
+                "robustness": self.robustness_score,
+                "signature_match": self.signature_match}
+
+    def _efficiency_cost(self) -> float:
+        """
+        Coût d'efficacité du circuit, normalisé par le nombre maximal de
+        portes : nombre de portes logiques + longueur du chemin critique
+
+        @return: Coût d'efficacité
+        """
+        critical_path = self.analysis.critical_path or 0
+        return (self.analysis.gate_count + critical_path) / self.max_gates
+
+    def _check_with_abc(self) -> bool:
+        """
+        Vérifie formellement l'équivalence du circuit avec le circuit cible
+        grâce à ABC
+
+        @return: Booléen indiquant si les circuits sont équivalents
+        """
+        # Sauvegarder le circuit + comparer avec les fonctionnalités
+        # avec le circuit de base
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix=".blif")
+        os.close(tmp_fd)
+        try:
+            self.circuit.export_to_blif(tmp_path, "tmp")
+            return check_circuits(tmp_path, self.target.abc_filepath,
+                                  self.abc_path)
+        finally:
+            os.remove(tmp_path)
+
     def _get_obs(self):
         """
         Retourne une observation sous forme de vecteur applati 1D contenant la
-        structure du circuit (matrice adjacence, types de portes logiques)
+        structure du circuit (matrice adjacence, types de portes logiques), ou
+        le graphe creux du circuit en mode "graph"
 
         @return: numpy array représentant l'état
         """
+        if self.observation_mode == "graph":
+            return self.graph_obs.observation()
 
         # Création de vecteur qui contiendront les informations sur le circuit
         # - Les types des différentes portes logiques
@@ -236,10 +467,26 @@ class LogicCircuitEnv(gym.Env):
         ])
         return flat_obs
 
+    def _decode_action(self, action) -> tuple[int, int, int, int]:
+        """
+        Convertit l'action de l'agent en tuple (type d'action, type de porte,
+        source, cible)
+
+        @param action: Action choisie par l'agent
+        @return: Tuple décrivant l'action
+        """
+        if self.action_mode == "factored":
+            return tuple(int(a) for a in action)
+
+        return self.valid_actions[action]
+
     def get_action_mask(self):
         """
         Génère un masque d'actions valides effectuables
         """
+        if self.action_mode == "factored":
+            return self._get_factored_action_mask()
+
         self.valid_actions = self._compute_valid_actions()
         mask = np.zeros(self.max_actions, dtype=bool)
 
@@ -248,6 +495,32 @@ class LogicCircuitEnv(gym.Env):
 
         return mask
 
+    def _get_factored_action_mask(self):
+        """
+        Génère le masque de l'action MultiDiscrete : concaténation des masques
+        de chaque composante, au format attendu par MaskablePPO
+        """
+        n_nodes = min(len(self.circuit.graph.nodes), self.max_gates)
+        n_edges = self.circuit.graph.number_of_edges()
+
+        action_type = np.array([
+            n_nodes < self.max_gates,  # ajouter une porte
+            n_nodes > 0,               # supprimer une porte
+            n_nodes > 1,               # connecter deux portes
+            n_edges > 0,               # déconnecter deux portes
+        ], dtype=bool)
+        gate_type = np.ones(len(self.available_gates), dtype=bool)
+        nodes = np.arange(self.max_gates) < n_nodes
+
+        # Le masque doit toujours autoriser au moins une valeur par
+        # composante
+        if not action_type.any():
+            action_type[0] = True
+        if n_nodes == 0:
+            nodes[0] = True
+
+        return np.concatenate([action_type, gate_type, nodes, nodes])
+
     def _compute_valid_actions(self):
         """
         Génère la liste des actions valides par l'algorithme de RL
@@ -283,6 +556,13 @@ class LogicCircuitEnv(gym.Env):
         if self.render_mode is None:
             return
 
+        # Import à la demande pour que les workers sans rendu ne chargent pas
+        # matplotlib
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+
         fig = plt.figure()
         canvas = FigureCanvas(fig)
         ax = fig.add_subplot(111)
@@ -351,3 +631,23 @@ class LogicCircuitEnv(gym.Env):
         dim_fan = self.max_gates * 2  # fanin + fanout
 
         return dim_gate_types + dim_adjacency + dim_inputs_outputs + dim_fan
+
+
+def env_kwargs_from_config(config: dict, **kwargs) -> dict:
+    """Paramètres d'un LogicCircuitEnv lus depuis le fichier de configuration
+    (config.json), partagés par l'entraînement et l'évaluation
+    @param config: Configuration chargée
+    @param kwargs: Paramètres ajoutés ou remplacés (corpus, target, verbose...)
+
+    @return: Dictionnaire des paramètres, ex: LogicCircuitEnv(**env_kwargs)
+    """
+    return {
+        "target_filepath": config.get("target_blif"),
+        "abc_path": config["abc_path"],
+        "max_gates": config.get("max_gates", 20),
+        "action_mode": config.get("action_mode", "discrete"),
+        "efficiency_weight": config.get("efficiency_weight", 0.0),
+        "robustness_weight": config.get("robustness_weight", 0.0),
+        "match_weight": config.get("match_weight", 0.0),
+        **kwargs,
+    }
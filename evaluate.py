@@ -0,0 +1,79 @@
+import argparse
+import functools
+import json
+import os
+
+from sb3_contrib.ppo_mask import MaskablePPO
+
+from circuit import CircuitCorpus, TargetCircuit
+from construct_agent import (LogicCircuitEnv, env_kwargs_from_config,
+                             evaluate_policy, write_report)
+
+# Évaluation d'un ou plusieurs modèles entraînés (MaskablePPO) sur les mêmes
+# épisodes graines, avec un rapport JSON par modèle pour comparer des
+# checkpoints
+
+
+def main():
+    """Évalue les modèles passés en arguments"""
+    parser = argparse.ArgumentParser(
+        description="Évaluation parallèle de modèles constructeurs entraînés")
+    parser.add_argument("models", nargs="+",
+                        help="Chemins des modèles sauvegardés (model.save)")
+    parser.add_argument("--episodes", type=int, default=100,
+                        help="Nombre d'épisodes par modèle")
+    parser.add_argument("--envs", type=int, default=os.cpu_count() or 1,
+                        help="Nombre d'environnements en parallèle")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Graine du premier épisode")
+    parser.add_argument("--stochastic", action="store_true",
+                        help="Actions tirées selon la politique (non déterministes)")
+    parser.add_argument("--sync", action="store_true",
+                        help="Environnements dans ce processus (débogage)")
+    parser.add_argument("--output-dir", default=".",
+                        help="Dossier des rapports <modèle>.eval.json")
+    args = parser.parse_args()
+
+    # Lire les config depuis le fichier json
+    with open('config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # Corpus rouvert par chaque worker, ou circuit cible chargé une fois et
+    # partagé avec les workers
+    corpus, target = None, None
+    if "corpus" in config:
+        corpus = CircuitCorpus(config["corpus"])
+    else:
+        target = TargetCircuit.from_blif(config["target_blif"])
+        target.to_shared_memory()
+
+    make_env = functools.partial(
+        LogicCircuitEnv, **env_kwargs_from_config(
+            config, target=target, corpus=corpus, verbose=False))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for model_path in args.models:
+        model = MaskablePPO.load(model_path)
+        report = evaluate_policy(model, [make_env] * args.envs,
+                                 n_episodes=args.episodes, seed=args.seed,
+                                 deterministic=not args.stochastic,
+                                 asynchronous=not args.sync)
+
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        write_report(report, os.path.join(args.output_dir, f"{name}.eval.json"),
+                     model=model_path, config=config, seed=args.seed)
+
+        summary = report["summary"]
+        steps = summary["mean_steps_to_equivalence"]
+        print(f"{name:<24} succès: {summary['success_rate']:6.1%}  "
+              f"étapes: {'-' if steps is None else f'{steps:.1f}':>6}  "
+              f"portes: {summary['mean_final_gate_count']:.1f}  "
+              f"({summary['episodes_per_second']:.1f} épisodes/s)")
+
+    if target is not None:
+        target.close()
+
+
+# Les workers des environnements importent ce module sans l'exécuter
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
+import functools
 import json
 
 from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
 from sb3_contrib.common.wrappers import ActionMasker
 from sb3_contrib.ppo_mask import MaskablePPO
 
-from construct_agent import LogicCircuitEnv
+from circuit import CircuitCorpus
+from construct_agent import (LogicCircuitEnv, env_kwargs_from_config,
+                             evaluate_policy, write_report)
 from gymnasium.wrappers import RecordVideo, RecordEpisodeStatistics
 
 
@@ -17,8 +20,12 @@ def mask_fn(env):
     return env.get_action_mask()
 
 
+# Corpus de circuits cibles (une cible par épisode), sinon une seule cible
+corpus = CircuitCorpus(config["corpus"]) if "corpus" in config else None
+
 # Environnement
-env = LogicCircuitEnv(config["target_blif"], config["abc_path"], render_mode='rgb_array')
+env = LogicCircuitEnv(render_mode='rgb_array',
+                      **env_kwargs_from_config(config, corpus=corpus))
 env = ActionMasker(env, mask_fn)
 
 # Enregistrer une vidéo de l'évolution
@@ -40,11 +47,14 @@ del model
 
 model = MaskablePPO.load("agent_constructeur")
 
-# Évaluation post-entraînement
-obs, _ = env.reset()
-done = False
-
-while not done:
-    action, _ = model.predict(obs, deterministic=True)
-    obs, reward, done, truncated, info = env.step(action)
-    print(f"Episode terminé avec reward: {reward}")
+# Évaluation post-entraînement sur plusieurs épisodes, prédictions groupées
+# (voir evaluate.py pour une évaluation parallèle et comparer des checkpoints)
+make_env = functools.partial(
+    LogicCircuitEnv,
+    **env_kwargs_from_config(config, corpus=corpus, verbose=False))
+report = evaluate_policy(model, [make_env] * config.get("eval_envs", 4),
+                         n_episodes=config.get("eval_episodes", 20),
+                         asynchronous=False)
+write_report(report, "agent_constructeur.eval.json",
+             model="agent_constructeur", config=config)
+print(f"Évaluation terminée: {report['summary']}")
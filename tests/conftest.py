@@ -0,0 +1,120 @@
+import os
+import random
+
+import networkx as nx
+import pytest
+
+from circuit import LogicCircuit, LogicGate
+
+
+@pytest.fixture
+def circuit() -> LogicCircuit:
+    """Circuit A, B -> AND -> OUT"""
+    circuit = LogicCircuit()
+    circuit.add_gate(LogicGate("INPUT", "A"))
+    circuit.add_gate(LogicGate("INPUT", "B"))
+    circuit.add_gate(LogicGate("AND", "G1"))
+    circuit.add_gate(LogicGate("OUTPUT", "OUT"))
+    circuit.connect("A", "G1")
+    circuit.connect("B", "G1")
+    circuit.connect("G1", "OUT")
+    return circuit
+
+
+@pytest.fixture
+def write_blif(tmp_path):
+    """Écrit un circuit BLIF dans le dossier temporaire du test
+
+    @return: Fonction (texte BLIF, nom du fichier sans extension) -> chemin
+    """
+    def write(text: str, name: str = "circuit") -> str:
+        path = os.path.join(tmp_path, f"{name}.blif")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+    return write
+
+
+@pytest.fixture
+def random_circuit():
+    """Génère des circuits aléatoires valides et exportables en BLIF : chaque
+    entrée est utilisée et chaque porte sans successeur alimente une sortie
+
+    @return: Fonction (graine, nombre d'entrées, nombre de portes) -> circuit
+    """
+    def make(seed: int, n_inputs: int, n_gates: int) -> LogicCircuit:
+        rng = random.Random(seed)
+        circuit = LogicCircuit()
+        ids = []
+        for i in range(n_inputs):
+            circuit.add_gate(LogicGate("INPUT", f"I{i}"))
+            ids.append(f"I{i}")
+
+        for j in range(n_gates):
+            gate_type = rng.choice(["AND", "OR", "NAND", "NOR", "XOR",
+                                    "XNOR", "NOT"])
+            if gate_type == "NOT":
+                arity = 1
+            elif gate_type in {"XOR", "XNOR"}:
+                arity = 2
+            else:
+                arity = rng.choice([2, 3])
+            arity = min(arity, len(ids))
+
+            # Les premières portes consomment chacune une entrée
+            preds = [ids[j]] if j < n_inputs else []
+            others = [n for n in ids if n not in preds]
+            preds += rng.sample(others, arity - len(preds))
+
+            gate_id = f"G{j}"
+            circuit.add_gate(LogicGate(gate_type, gate_id))
+            for pred in preds:
+                circuit.connect(pred, gate_id)
+            ids.append(gate_id)
+
+        sinks = [n for n in circuit.graph.nodes
+                 if circuit.graph.out_degree(n) == 0]
+        for k, sink in enumerate(sinks):
+            circuit.add_gate(LogicGate("OUTPUT", f"O{k}"))
+            circuit.connect(sink, f"O{k}")
+        return circuit
+    return make
+
+
+@pytest.fixture
+def random_edit():
+    """Modifie aléatoirement un circuit sans créer de boucle : ajout de porte,
+    connexion, déconnexion ou suppression (refusée si le circuit devient
+    invalide). Seules les portes à plusieurs entrées reçoivent de nouvelles
+    connexions
+
+    @return: Fonction (circuit, générateur aléatoire) -> None
+    """
+    def edit(circuit: LogicCircuit, rng: random.Random):
+        graph = circuit.graph
+        nodes = list(graph.nodes)
+        types = {n: graph.nodes[n]["gate"].gate_type for n in nodes}
+        sources = [n for n in nodes if types[n] != "OUTPUT"]
+        multi = [n for n in nodes
+                 if types[n] not in {"INPUT", "OUTPUT", "NOT", "BUF"}]
+        action = rng.choice(["add", "connect", "disconnect", "remove"])
+
+        if action == "add":
+            gate_id = f"N{len(nodes)}"
+            while graph.has_node(gate_id):
+                gate_id += "_"
+            circuit.add_gate(LogicGate(
+                rng.choice(["AND", "OR", "NAND", "NOR", "XOR", "XNOR"]),
+                gate_id))
+            for pred in rng.sample(sources, min(2, len(sources))):
+                circuit.connect(pred, gate_id)
+        elif action == "connect" and multi:
+            from_id, to_id = rng.choice(sources), rng.choice(multi)
+            if from_id != to_id and not graph.has_edge(from_id, to_id) and \
+                    not nx.has_path(graph, to_id, from_id):
+                circuit.connect(from_id, to_id)
+        elif action == "disconnect" and graph.number_of_edges():
+            circuit.disconnect(*rng.choice(list(graph.edges)))
+        elif action == "remove" and multi:
+            circuit.remove_gate(rng.choice(multi))
+    return edit
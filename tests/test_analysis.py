@@ -0,0 +1,45 @@
+import random
+
+from circuit import CircuitAnalysis, LogicGate
+
+
+def test_critical_path_ignores_dangling_chains(circuit):
+    """Une chaîne qui n'atteint aucune sortie ne compte pas dans le chemin
+    critique"""
+    analysis = CircuitAnalysis(circuit)
+    assert analysis.critical_path == 2
+
+    previous = "G1"
+    for k in range(2, 6):
+        circuit.add_gate(LogicGate("NOT", f"G{k}"))
+        circuit.connect(previous, f"G{k}")
+        previous = f"G{k}"
+    assert analysis.critical_path == 2
+    assert analysis.slack("G1") == 0
+    assert analysis.slack("G5") is None
+
+    # Rattachée à la sortie, la chaîne devient le chemin critique
+    circuit.disconnect("G1", "OUT")
+    circuit.connect("G5", "OUT")
+    assert analysis.critical_path == 6
+    assert analysis.slack("G3") == 0
+
+    fresh = CircuitAnalysis(circuit)
+    assert fresh.level == analysis.level and fresh.depth == analysis.depth
+
+
+def test_incremental_matches_recompute(random_circuit, random_edit):
+    rng = random.Random(0)
+    for seed in range(10):
+        circuit = random_circuit(seed, 4, 10)
+        analysis = CircuitAnalysis(circuit)
+        for _ in range(40):
+            random_edit(circuit, rng)
+            fresh = CircuitAnalysis(circuit)
+            assert analysis.level == fresh.level
+            assert analysis.depth == fresh.depth
+            assert analysis.metrics() == fresh.metrics()
+            assert all(analysis.slack(n) == fresh.slack(n)
+                       for n in circuit.graph.nodes)
+            fresh.close()
+        analysis.close()
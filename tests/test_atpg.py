@@ -0,0 +1,54 @@
+import itertools
+
+from attacker import ATPG, FAULT_KINDS, FaultyCircuit
+
+
+def _detects(circuit, fault, vector: dict[str, bool]) -> bool:
+    faulty = FaultyCircuit(circuit)
+    faulty.add_fault(*fault)
+    return faulty.evaluate(vector) != circuit.evaluate(vector)
+
+
+def _vectors(circuit):
+    inputs = [n for n in circuit.graph.nodes
+              if circuit.graph.nodes[n]["gate"].gate_type == "INPUT"]
+    for bits in itertools.product((False, True), repeat=len(inputs)):
+        yield dict(zip(inputs, bits))
+
+
+def test_scoap(circuit):
+    atpg = ATPG(circuit)
+    index = atpg.compiled.index
+    assert atpg.cc0[index["A"]] == atpg.cc1[index["A"]] == 1
+    assert (atpg.cc0[index["G1"]], atpg.cc1[index["G1"]]) == (2, 3)
+    assert atpg.co[index["OUT"]] == 0
+    assert atpg.co[index["G1"]] == 1
+    assert atpg.co[index["A"]] == 3
+
+
+def test_generate_matches_brute_force(random_circuit):
+    for seed in range(15):
+        circuit = random_circuit(seed, 4, 10)
+        atpg = ATPG(circuit)
+        for gate_id in circuit.graph.nodes:
+            for kind in FAULT_KINDS:
+                fault = (gate_id, *kind)
+                status, vector = atpg.generate(*fault)
+                detectable = any(_detects(circuit, fault, v)
+                                 for v in _vectors(circuit))
+                assert status == ("detected" if detectable else "redundant")
+                if vector is not None:
+                    assert _detects(circuit, fault, vector)
+
+
+def test_run_with_fault_dropping(random_circuit):
+    for seed in range(5):
+        circuit = random_circuit(seed, 4, 10)
+        results = ATPG(circuit).run()
+        single = ATPG(circuit).run(fault_dropping=False)
+
+        assert results.keys() == single.keys()
+        for fault, (status, vector) in results.items():
+            assert status == single[fault][0]
+            if status == "detected":
+                assert _detects(circuit, fault, vector)
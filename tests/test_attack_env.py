@@ -0,0 +1,36 @@
+import itertools
+
+import numpy as np
+
+from attacker import FaultAttackEnv
+
+
+def _corruption(circuit, faulty) -> float:
+    inputs = [n for n in circuit.graph.nodes
+              if circuit.graph.nodes[n]["gate"].gate_type == "INPUT"]
+    vectors = [dict(zip(inputs, bits))
+               for bits in itertools.product((False, True), repeat=len(inputs))]
+    corrupted = sum(faulty.evaluate(v) != circuit.evaluate(v) for v in vectors)
+    return corrupted / len(vectors)
+
+
+def test_corruption_matches_faulty_circuit(random_circuit):
+    rng = np.random.default_rng(0)
+    for seed in range(10):
+        circuit = random_circuit(seed, 5, 10)
+        env = FaultAttackEnv(circuit, max_faults=4)
+        _, info = env.reset()
+        assert info["corruption"] == 0.0
+
+        done = False
+        while not done:
+            action = rng.choice(np.flatnonzero(env.get_action_mask()))
+            _, _, done, _, info = env.step(action)
+            assert info["corruption"] == \
+                _corruption(circuit, env.faulty_circuit())
+
+            # Une deuxième faute sur la même porte est refusée
+            if not done:
+                _, reward, _, _, again = env.step(action)
+                assert reward == -1.0
+                assert again["n_faults"] == info["n_faults"]
@@ -0,0 +1,65 @@
+import itertools
+import os
+import random
+
+from circuit import BDD, BDDEquivalenceChecker, LogicGate, TargetCircuit
+
+
+def _truth_table(circuit, inputs: list[str]) -> list[dict[str, bool]]:
+    return [circuit.evaluate(dict(zip(inputs, bits)))
+            for bits in itertools.product((False, True), repeat=len(inputs))]
+
+
+def _target(circuit, tmp_path) -> TargetCircuit:
+    path = os.path.join(tmp_path, "cible.blif")
+    circuit.export_to_blif(path)
+    return TargetCircuit.from_blif(path)
+
+
+def test_bdd_canonical():
+    bdd = BDD(["a", "b", "c"])
+    a, b, c = (bdd.variable(name) for name in "abc")
+
+    # De Morgan et distributivité donnent les mêmes racines
+    assert bdd.not_(bdd.and_(a, b)) == bdd.or_(bdd.not_(a), bdd.not_(b))
+    assert bdd.and_(a, bdd.or_(b, c)) == \
+        bdd.or_(bdd.and_(a, b), bdd.and_(a, c))
+    assert bdd.xor(a, a) == BDD.FALSE
+    assert bdd.ite(a, b, b) == b
+    assert bdd.gate("NAND", [a, b, c]) == bdd.not_(bdd.gate("AND", [a, b, c]))
+
+
+def test_check_matches_truth_table(random_circuit, tmp_path):
+    rng = random.Random(0)
+    for seed in range(20):
+        reference = random_circuit(seed, 4, 8)
+        inputs = [f"I{i}" for i in range(4)]
+        target = _target(reference, tmp_path)
+        expected = _truth_table(reference, inputs)
+
+        checkers = [BDDEquivalenceChecker(target),
+                    BDDEquivalenceChecker(target, order="input")]
+        assert all(c.check(reference) is True for c in checkers)
+
+        # Mutations d'un type de porte, équivalentes ou non à la cible
+        for _ in range(5):
+            candidate = random_circuit(seed, 4, 8)
+            graph = candidate.graph
+            gate_id = rng.choice([n for n in graph.nodes
+                                  if n.startswith("G") and
+                                  graph.in_degree(n) > 1])
+            types = ["AND", "OR", "NAND", "NOR"]
+            if graph.in_degree(gate_id) == 2:
+                types += ["XOR", "XNOR"]
+            graph.nodes[gate_id]["gate"] = LogicGate(rng.choice(types), gate_id)
+
+            equivalent = _truth_table(candidate, inputs) == expected
+            for checker in checkers:
+                assert checker.check(candidate) is equivalent
+
+
+def test_node_limit_returns_none(random_circuit, tmp_path):
+    reference = random_circuit(1, 4, 12)
+    checker = BDDEquivalenceChecker(_target(reference, tmp_path), max_nodes=3)
+    assert checker.target_roots is None
+    assert checker.check(reference) is None
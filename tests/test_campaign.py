@@ -0,0 +1,124 @@
+import itertools
+import json
+import os
+
+import numpy as np
+import pytest
+
+from attacker import (MANIFEST_FILENAME, FaultyCircuit, completed_jobs,
+                      iter_campaign, make_jobs, run_campaign, run_job)
+from circuit import LogicCircuit
+
+BLIF = """.model petit
+.inputs A B C
+.outputs OUT
+.names A B AB
+11 1
+.names AB C OUT
+1- 1
+-1 1
+.end
+"""
+
+# Portes à trois entrées
+BLIF_NARY = """.model trois
+.inputs A B C
+.outputs X Y
+.names A B C G1
+111 1
+.names A B C G2
+100 1
+010 1
+001 1
+111 1
+.names G1 G2 C G3
+000 1
+.names G3 X
+1 1
+.names G2 Y
+1 1
+.end
+"""
+
+
+def test_run_job_matches_faulty_circuit(write_blif):
+    """La campagne (simulation bit-parallèle) et FaultyCircuit (porte par
+    porte) donnent les mêmes sorties fautives, portes à n entrées comprises"""
+    circuit_path = write_blif(BLIF_NARY, "trois")
+    circuit = LogicCircuit.from_blif(circuit_path)
+    inputs = ["A", "B", "C"]
+    patterns = [dict(zip(inputs, values))
+                for values in itertools.product([False, True], repeat=3)]
+
+    for job in make_jobs([circuit_path], n_words=1):
+        _, _, _, _, faults, _, _, _ = job
+        faulty = FaultyCircuit(circuit)
+        for gate_id, fault_type, stuck_value in faults:
+            faulty.add_fault(gate_id, fault_type, stuck_value)
+
+        corrupted = output_flips = 0
+        for pattern in patterns:
+            good = circuit.evaluate(pattern)
+            bad = faulty.evaluate(pattern)
+            flips = sum(good[o] != bad[o] for o in good)
+            corrupted += flips > 0
+            output_flips += flips
+
+        row = run_job(job)
+        assert row[4:] == (len(patterns), corrupted, output_flips), faults
+
+
+def test_resume_after_truncated_manifest_line(tmp_path, write_blif):
+    """Une ligne de manifeste à moitié écrite (processus tué pendant
+    l'écriture) ne doit pas empêcher la reprise de la campagne"""
+    circuit_path = write_blif(BLIF, "petit")
+    output_dir = os.path.join(tmp_path, "campagne")
+    jobs = list(make_jobs([circuit_path], n_blocks=2, n_words=1))
+
+    # Première moitié des jobs, puis écriture du manifeste interrompue
+    run_campaign(jobs[:len(jobs) // 2], output_dir, n_workers=1,
+                 batch_size=2, chunk_rows=3)
+    manifest = os.path.join(output_dir, MANIFEST_FILENAME)
+    with open(manifest, "a", encoding="utf-8") as f:
+        f.write('{"part": "part-000')
+
+    run_campaign(jobs, output_dir, n_workers=1, batch_size=2, chunk_rows=3)
+
+    # Tous les jobs sont terminés, une seule fois chacun
+    job_ids = np.concatenate([part["job_id"]
+                              for part in iter_campaign(output_dir)])
+    assert sorted(job_ids.tolist()) == [job[0] for job in jobs]
+    assert len(completed_jobs(output_dir)) == len(jobs)
+
+    # Manifeste réparé : chaque ligne est lisible, aucune partie réutilisée
+    with open(manifest, "r", encoding="utf-8") as f:
+        parts = [json.loads(line)["part"] for line in f]
+    assert len(parts) == len(set(parts))
+
+    # Une nouvelle reprise n'a plus rien à faire
+    run_campaign(jobs, output_dir, n_workers=1, batch_size=2, chunk_rows=3)
+    with open(manifest, "r", encoding="utf-8") as f:
+        assert len(f.readlines()) == len(parts)
+
+
+def test_interrupted_campaign_keeps_finished_rows(tmp_path, write_blif):
+    """Les lignes reçues avant une erreur sont écrites, et la reprise ne
+    relance que les jobs manquants"""
+    circuit_path = write_blif(BLIF, "petit")
+    output_dir = os.path.join(tmp_path, "campagne")
+    jobs = list(make_jobs([circuit_path], n_blocks=1, n_words=1))
+    missing = os.path.join(tmp_path, "absent.blif")
+    broken = (len(jobs), 1, missing, 0, [], 0, 1, 0)
+
+    with pytest.raises(FileNotFoundError):
+        run_campaign(jobs + [broken], output_dir, n_workers=1, batch_size=1,
+                     chunk_rows=1000)
+    done = completed_jobs(output_dir)
+    assert 0 < len(done) <= len(jobs)
+    assert len(jobs) not in done
+
+    run_campaign(jobs, output_dir, n_workers=1, batch_size=1)
+    done = completed_jobs(output_dir)
+    assert len(done) == len(jobs)
+    assert all(job[0] in done for job in jobs)
+    assert len(jobs) + 1000 not in done
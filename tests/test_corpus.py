@@ -0,0 +1,70 @@
+import os
+import pickle
+
+import numpy as np
+
+from circuit import CircuitCorpus, LogicGate, TargetCircuit, write_corpus
+
+SIZES = [(3, 5), (5, 9), (17, 24)]
+
+
+def _write(random_circuit, tmp_path) -> tuple[list, list[str], str]:
+    circuits, paths = [], []
+    for seed, (n_inputs, n_gates) in enumerate(SIZES):
+        circuit = random_circuit(seed, n_inputs, n_gates)
+        path = os.path.join(tmp_path, f"c{seed}.blif")
+        circuit.export_to_blif(path)
+        circuits.append(circuit)
+        paths.append(path)
+
+    corpus_path = os.path.join(tmp_path, "cibles.corpus")
+    assert write_corpus(paths, corpus_path, n_random_words=4, seed=3) == 3
+    return circuits, paths, corpus_path
+
+
+def test_round_trip(random_circuit, tmp_path):
+    circuits, paths, corpus_path = _write(random_circuit, tmp_path)
+    corpus = CircuitCorpus(corpus_path)
+    assert len(corpus) == len(paths)
+
+    for i, (circuit, path) in enumerate(zip(circuits, paths)):
+        expected = TargetCircuit.from_blif(path, n_random_words=4, seed=3)
+        assert corpus.text(i) == expected.blif_text
+        assert np.array_equal(corpus.signatures(i), expected.signatures)
+        assert corpus.metadata(i) == {
+            "n_inputs": len(expected.inputs),
+            "n_outputs": len(expected.outputs),
+            "n_nodes": len(expected.model.nodes),
+            "exhaustive": expected.exhaustive,
+            "structural_hash": expected.structural_hash}
+
+        # La cible relue donne le même résultat de comparaison
+        target = corpus.target(i)
+        assert np.array_equal(target.patterns, expected.patterns)
+        assert target.compare(circuit) == expected.compare(circuit)
+        assert target.compare(circuit) is (True if expected.exhaustive
+                                           else None)
+
+        # Une sortie inversée diffère sur tous les motifs
+        pred = next(circuit.graph.predecessors("O0"))
+        circuit.disconnect(pred, "O0")
+        circuit.add_gate(LogicGate("NOT", "INV"))
+        circuit.connect(pred, "INV")
+        circuit.connect("INV", "O0")
+        assert target.compare(circuit) is False
+
+    assert corpus.select(max_inputs=5).tolist() == [0, 1]
+    assert corpus.select(min_inputs=4, exhaustive=False).tolist() == [2]
+    corpus.close()
+
+
+def test_pickle(random_circuit, tmp_path):
+    _, _, corpus_path = _write(random_circuit, tmp_path)
+    corpus = CircuitCorpus(corpus_path)
+    copy = pickle.loads(pickle.dumps(corpus))
+    assert len(copy) == len(corpus)
+    for i in range(len(corpus)):
+        assert copy.text(i) == corpus.text(i)
+        assert np.array_equal(copy.signatures(i), corpus.signatures(i))
+    copy.close()
+    corpus.close()
@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+
+from construct_agent import LogicCircuitEnv, evaluate_policy, write_report
+from construct_agent.evaluation import _EvaluationInfo
+
+# Le circuit initial (AND des entrées) est équivalent à la cible ET mais pas
+# à la cible OU
+BLIF_AND = """.model et
+.inputs A B
+.outputs OUT
+.names A B OUT
+11 1
+.end
+"""
+
+BLIF_OR = """.model ou
+.inputs A B
+.outputs OUT
+.names A B OUT
+1- 1
+-1 1
+.end
+"""
+
+MAX_STEPS = 3
+
+
+class ConnectModel:
+    """Politique factice : reconnecte A -> G1 (noeuds 0 et 2 dans l'ordre
+    trié), ce qui ne modifie pas le circuit"""
+
+    def __init__(self, max_gates: int):
+        self.max_gates = max_gates
+
+    def predict(self, obs, action_masks=None, deterministic=True):
+        n_types = action_masks.shape[1] - 4 - 2 * self.max_gates
+        action = np.array([2, 0, 0, 2])
+        offsets = np.array([0, 4, 4 + n_types, 4 + n_types + self.max_gates])
+        assert action_masks[:, offsets + action].all()
+        return np.tile(action, (len(obs), 1)), None
+
+
+def _make_env(path: str, max_gates: int) -> LogicCircuitEnv:
+    env = LogicCircuitEnv(path, "abc", max_gates=max_gates,
+                          action_mode="factored", verbose=False)
+    env.max_steps = MAX_STEPS
+    return env
+
+
+def test_evaluate_policy(write_blif, tmp_path):
+    paths = [write_blif(BLIF_AND, "et"), write_blif(BLIF_OR, "ou")]
+    model = ConnectModel(max_gates=6)
+    env_fns = [lambda p=p: _make_env(p, model.max_gates) for p in paths]
+
+    report = evaluate_policy(model, env_fns, n_episodes=5, seed=10,
+                             asynchronous=False)
+    episodes = report["episodes"]
+    assert [e["episode"] for e in episodes] == list(range(5))
+    assert [e["seed"] for e in episodes] == list(range(10, 15))
+    for e in episodes:
+        # Succès immédiat sur la cible ET, troncature sur la cible OU
+        assert e["steps"] == (1 if e["success"] else MAX_STEPS)
+        assert e["gate_count"] == 1 and e["critical_path"] == 2
+
+    successes = sum(e["success"] for e in episodes)
+    summary = report["summary"]
+    assert 0 < successes < 5
+    assert summary["n_episodes"] == 5
+    assert summary["success_rate"] == successes / 5
+    assert summary["mean_steps_to_equivalence"] == 1.0
+    assert summary["mean_final_gate_count"] == 1.0
+    assert summary["mean_return"] == np.mean([e["return"] for e in episodes])
+
+    path = os.path.join(tmp_path, "rapport.json")
+    write_report(report, path, model="factice")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"model": "factice", **report}
+
+
+def test_evaluation_info():
+    info = {"metrics": {"critical_path": None, "gate_count": 3,
+                        "area": {"AND": 3}},
+            "robustness": None}
+    assert _EvaluationInfo._info(info) == {"gate_count": 3,
+                                           "critical_path": -1}
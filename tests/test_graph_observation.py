@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+
+from construct_agent.graph_observation import GraphObservation
+
+GATE_TYPES = ["AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR"]
+
+
+def _as_dicts(observation: GraphObservation) -> tuple[dict, set]:
+    obs = observation.observation()
+    ids = observation.node_ids
+    features = {gate_id: tuple(obs.nodes[i]) for i, gate_id in enumerate(ids)}
+    edges = {(ids[src], ids[dst]) for src, dst in obs.edge_links}
+    assert len(obs.edges) == len(obs.edge_links) == len(edges)
+    return features, edges
+
+
+def test_incremental_matches_fresh(random_circuit, random_edit):
+    rng = random.Random(0)
+    for seed in range(10):
+        circuit = random_circuit(seed, 4, 10)
+        observation = GraphObservation(circuit, GATE_TYPES)
+        for _ in range(40):
+            random_edit(circuit, rng)
+            fresh = GraphObservation(circuit, GATE_TYPES)
+            assert _as_dicts(observation) == _as_dicts(fresh)
+            assert set(observation.node_ids) == set(circuit.graph.nodes)
+            assert set(observation.edge_keys) == set(circuit.graph.edges)
+            fresh.close()
+        observation.close()
+
+
+def test_features(circuit):
+    observation = GraphObservation(circuit, GATE_TYPES)
+    features, edges = _as_dicts(observation)
+    assert edges == set(circuit.graph.edges)
+
+    g1 = np.array(features["G1"])
+    assert g1[GATE_TYPES.index("AND")] == 1 and g1[:-2].sum() == 1
+    assert tuple(g1[-2:]) == (2, 1)
+    assert features["OUT"][len(GATE_TYPES) + 1] == 1
+    assert observation.space(GATE_TYPES).contains(observation.observation())
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from circuit import CircuitCorpus, write_corpus
+from construct_agent import LogicCircuitEnv, env_kwargs_from_config
+
+BLIF = """.model et
+.inputs A B
+.outputs OUT
+.names A B OUT
+11 1
+.end
+"""
+
+
+def test_positional_parameters(write_blif):
+    """Les paramètres ajoutés ne décalent pas les paramètres positionnels
+    existants"""
+    env = LogicCircuitEnv(write_blif(BLIF, "et"), "abc", None, None, 12,
+                          "factored", "graph", 0.5, 0.25, {"n_faults": 8},
+                          1000)
+    assert env.max_gates == 12
+    assert env.action_mode == "factored"
+    assert env.observation_mode == "graph"
+    assert env.efficiency_weight == 0.5
+    assert env.robustness_weight == 0.25
+    assert env.robustness_kwargs == {"n_faults": 8}
+    assert env.bdd_max_nodes == 1000
+    assert env.match_weight == 0.0
+
+
+def test_bdd_checker_built_on_first_use(write_blif):
+    """Le BDD d'une cible sans table de vérité complète n'est construit qu'à
+    la première vérification que la simulation ne tranche pas"""
+    inputs = [f"I{i}" for i in range(20)]
+    path = write_blif(f".model large\n.inputs {' '.join(inputs)}\n.outputs OUT\n"
+                      f".names {' '.join(inputs)} OUT\n{'1' * 20} 1\n.end\n",
+                      "large")
+
+    env = LogicCircuitEnv(path, "abc", max_gates=30, action_mode="factored",
+                          verbose=False)
+    env.reset(seed=0)
+    assert not env.target.exhaustive
+    assert env.bdd_checker is None
+
+    # Le circuit initial (AND de toutes les entrées) est la cible : la
+    # simulation ne peut pas conclure, le BDD prouve l'équivalence. La
+    # connexion I0 -> G1 existe déjà, le circuit reste inchangé
+    nodes = sorted(env.circuit.graph.nodes)
+    _, reward, done, _, _ = env.step(
+        (2, 0, nodes.index("I0"), nodes.index("G1")))
+    assert env.bdd_checker is not None
+    assert done and reward == 10
+
+
+def test_single_input_target_starts_valid(write_blif):
+    """Une cible à une seule entrée part d'un buffer, pas d'une porte AND à
+    une entrée"""
+    path = write_blif(".model id\n.inputs A\n.outputs OUT\n"
+                      ".names A OUT\n1 1\n.end\n", "id")
+    env = LogicCircuitEnv(path, "abc", verbose=False)
+    env.reset(seed=0)
+    assert env.circuit.graph.nodes["G1"]["gate"].gate_type == "BUF"
+    assert env.circuit.is_valid()
+    assert env.signatures.compare() is True
+
+
+def test_corpus_targets(tmp_path, write_blif):
+    """Filtre par défaut des cibles du corpus et cache des cibles (la moins
+    récemment utilisée est retirée)"""
+    paths = [write_blif(BLIF, "et"),
+             write_blif(BLIF.replace("11 1", "1- 1\n-1 1"), "ou")]
+    corpus_path = os.path.join(tmp_path, "cibles.corpus")
+    write_corpus(paths, corpus_path)
+    corpus = CircuitCorpus(corpus_path)
+
+    # Circuit initial de 4 portes : il faut au moins une place libre
+    assert LogicCircuitEnv(None, "abc", corpus=corpus, max_gates=5,
+                           verbose=False).corpus_ids.tolist() == [0, 1]
+    with pytest.raises(ValueError):
+        LogicCircuitEnv(None, "abc", corpus=corpus, max_gates=4)
+
+    env = LogicCircuitEnv(None, "abc", corpus=corpus, verbose=False)
+    env.TARGET_CACHE_SIZE = 2
+    env._set_target(0)
+    env._set_target(1)
+    first = env._targets[0][0]
+    env._set_target(0)
+    assert list(env._targets) == [1, 0]
+    assert env.target is first
+    corpus.close()
+
+
+def test_env_kwargs_from_config(write_blif):
+    config = {"abc_path": "abc", "target_blif": write_blif(BLIF, "et"),
+              "max_gates": 12, "match_weight": 0.5}
+    env = LogicCircuitEnv(**env_kwargs_from_config(config, verbose=False))
+    assert env.max_gates == 12
+    assert env.match_weight == 0.5
+    assert env.action_mode == "discrete"
+    assert not env.verbose
@@ -0,0 +1,27 @@
+from circuit import LogicGate
+
+
+def test_is_valid(circuit):
+    assert circuit.is_valid()
+
+    # Porte sans assez d'entrées
+    circuit.add_gate(LogicGate("OR", "G2"))
+    assert not circuit.is_valid()
+    circuit.connect("A", "G2")
+    circuit.connect("B", "G2")
+    assert circuit.is_valid()
+
+
+def test_is_valid_unreachable_output(circuit):
+    # Sortie alimentée par une boucle sans entrée
+    circuit.add_gate(LogicGate("NOT", "N1"))
+    circuit.add_gate(LogicGate("NOT", "N2"))
+    circuit.add_gate(LogicGate("OUTPUT", "OUT2"))
+    circuit.connect("N1", "N2")
+    circuit.connect("N2", "N1")
+    circuit.connect("N2", "OUT2")
+    assert not circuit.is_valid()
+
+    circuit.disconnect("N2", "N1")
+    circuit.connect("G1", "N1")
+    assert circuit.is_valid()
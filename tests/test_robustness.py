@@ -0,0 +1,50 @@
+import pytest
+
+from attacker import RobustnessEvaluator
+from circuit import LogicGate
+
+
+def test_cache_disabled(circuit):
+    evaluator = RobustnessEvaluator(circuit, cache_size=0)
+    score = evaluator.score()
+    assert 0 <= score <= 1
+    assert evaluator.score() == score
+    assert not evaluator.cache
+
+
+def test_negative_cache_size(circuit):
+    with pytest.raises(ValueError):
+        RobustnessEvaluator(circuit, cache_size=-1)
+
+
+def test_incremental_results_match_fresh_evaluation(circuit):
+    """Après des modifications, les résultats gardés et réévalués sont ceux
+    d'un évaluateur neuf sur le circuit modifié"""
+    evaluator = RobustnessEvaluator(circuit, n_faults=12, cache_size=0)
+    evaluator.score()
+
+    circuit.add_gate(LogicGate("XOR", "G2"))
+    circuit.connect("A", "G2")
+    circuit.connect("B", "G2")
+    evaluator.score()
+    circuit.disconnect("G1", "OUT")
+    circuit.connect("G2", "OUT")
+    circuit.connect("G1", "G2")
+    evaluator.score()
+
+    fresh = RobustnessEvaluator(circuit, n_faults=0, cache_size=0)
+    fresh.simulator.update()
+    for fault, result in evaluator.results.items():
+        assert result == fresh._masked_fraction(fault)
+    assert len(evaluator.results) == len(evaluator.faults)
+
+
+def test_structural_hash_independent_of_edit_order(circuit):
+    evaluator = RobustnessEvaluator(circuit)
+    key = evaluator.structural_hash()
+    circuit.add_gate(LogicGate("OR", "G2"))
+    circuit.connect("A", "G2")
+    assert evaluator.structural_hash() != key
+    circuit.disconnect("A", "G2")
+    circuit.remove_gate("G2")
+    assert evaluator.structural_hash() == key
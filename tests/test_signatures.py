@@ -0,0 +1,61 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from circuit import (CompiledCircuit, LogicGate, SignatureTracker,
+                     TargetCircuit, WORD_BITS, popcount)
+
+
+def _target(circuit, tmp_path) -> TargetCircuit:
+    path = os.path.join(tmp_path, "cible.blif")
+    circuit.export_to_blif(path)
+    return TargetCircuit.from_blif(path)
+
+
+def _match_fraction(values, compiled, target) -> float:
+    matching = 0
+    for i, output in enumerate(target.outputs):
+        if output in compiled.index:
+            matching += popcount(~(values[compiled.index[output]]
+                                   ^ target.signatures[i]))
+    return matching / (len(target.outputs) * target.patterns.shape[1]
+                       * WORD_BITS)
+
+
+def test_tracker_matches_fresh_simulation(random_circuit, random_edit,
+                                          tmp_path):
+    rng = random.Random(0)
+    for seed in range(10):
+        target = _target(random_circuit(seed, 4, 8), tmp_path)
+        circuit = random_circuit(seed, 4, 8)
+        tracker = SignatureTracker(circuit, target)
+        assert tracker.compare() is True
+
+        for _ in range(30):
+            random_edit(circuit, rng)
+            compiled = CompiledCircuit(circuit)
+            values = compiled.simulate(target.input_words)
+
+            assert tracker.compare() == target.compare(circuit)
+            assert set(tracker.values) == set(compiled.node_ids)
+            for gate_id, i in compiled.index.items():
+                assert np.array_equal(tracker.values[gate_id], values[i])
+            assert tracker.match_fraction() == \
+                _match_fraction(values, compiled, target)
+        tracker.close()
+
+
+def test_tracker_detects_loops(circuit, tmp_path):
+    tracker = SignatureTracker(circuit, _target(circuit, tmp_path))
+    circuit.add_gate(LogicGate("OR", "G2"))
+    circuit.connect("G1", "G2")
+    circuit.connect("G2", "G1")
+    assert tracker.match_fraction() is None
+    with pytest.raises(ValueError):
+        tracker.compare()
+
+    circuit.disconnect("G2", "G1")
+    circuit.connect("A", "G2")
+    assert tracker.match_fraction() == 1.0